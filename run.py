@@ -1,12 +1,9 @@
-import subprocess
-import sys
-
-from src import helpers
 import argparse
+import importlib.util
+import sys
 
-try:
-    import termcolor
-except ModuleNotFoundError:
+# only check that the dependency is installed, it will be imported when it's needed
+if importlib.util.find_spec('termcolor') is None:
     print('Trying to install dependencies automatically...')
     print('If this fails, install them manually by doing')
     print('pip3 install -r requirements.txt')
@@ -18,11 +15,54 @@ except ModuleNotFoundError:
     requirements_path = os.path.abspath(os.path.join(os.path.dirname(__file__), 'requirements.txt'))
     subprocess.call(['pip3', 'install', '-r', requirements_path])
 
-from src.main import main
+from src.main import convert, main, serve
 from src.consts import DATA_FILE
 
+# run.py export/import: convert between learndata files and binary decks
+if sys.argv[1:2] in (['export'], ['import']):
+    command = sys.argv[1]
+    converter = argparse.ArgumentParser(prog=f'run.py {command}', description=(
+        'Convert a learndata file to a binary deck, that is memory-mapped instead of parsed' if command == 'export' else
+        'Convert a binary deck back to a learndata file'))
+    converter.add_argument('source', metavar='PATH')
+    converter.add_argument('destination', metavar='DESTINATION', nargs='?', default=None,
+                           help='defaults to PATH with a .deck extension' if command == 'export' else
+                                'defaults to PATH with a .txt extension')
+    converter.add_argument('--force', action='store_true', help='overwrite DESTINATION if it already exists')
+    args = converter.parse_args(sys.argv[2:])
+    args.command = command
+    sys.exit(convert(args))
+
+# run.py serve: quiz server for many learners at once
+if sys.argv[1:2] == ['serve']:
+    server_parser = argparse.ArgumentParser(prog='run.py serve', description=(
+        'Serve learndata files to many learners at once, over HTTP (open the URL in a browser, or use the JSON API)'))
+    server_parser.add_argument('paths', metavar='PATH', nargs='+', help='learndata files, directories or glob patterns')
+    server_parser.add_argument('--host', default='127.0.0.1', help='address to listen on (defaults to 127.0.0.1, '
+                                                                 'use 0.0.0.0 to accept other computers of the network)')
+    server_parser.add_argument('--port', type=int, default=8080, help='defaults to 8080')
+    server_parser.add_argument('--session-timeout', metavar='SECONDS', type=float, default=3600,
+                               help='forget the sessions that were not used for this long (defaults to an hour)')
+    sys.exit(serve(server_parser.parse_args(sys.argv[2:])))
+
 parser = argparse.ArgumentParser(description='Learn stuff efficiently with two different modes, to learn and validate your knowledge.')
 parser.add_argument('file', metavar='PATH', nargs='?', default=None)
+parser.add_argument('--profile', metavar='TRACE', default=None,
+                    help='write a Chrome trace (JSON) of where time was spent, by the program and by you, to this file')
+parser.add_argument('--resume', action='store_true',
+                    help='continue the last session of this file where it was interrupted')
+parser.add_argument('--recap', metavar='FILE', default=None,
+                    help="write the items you need to learn about to this file when they don't fit in the terminal, "
+                         'instead of showing them through a pager')
+parser.add_argument('--answers', metavar='SHEETS', default=None,
+                    help='grade the answer sheets of this tab-separated file ("-" for stdin) instead of asking questions. '
+                         'If this is a directory, all of its files are graded in parallel, and a per-item report is written')
+parser.add_argument('--workers', type=int, default=None,
+                    help='number of processes used to grade a directory of answer sheets (defaults to the number of CPUs)')
+parser.add_argument('--output', metavar='RESULTS', default='-',
+                    help='where to write the grades of --answers ("-" for stdout, the default)')
+parser.add_argument('--format', choices=('json', 'csv'), default=None,
+                    help="format of --output. Defaults to csv if --output's extension is .csv, json otherwise")
 flags = parser.parse_args()
 
 main(flags)
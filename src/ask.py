@@ -1,37 +1,46 @@
 import shutil
-import time
 
 from src.helpers import cprint, term_size
 from src.consts import *
-from src import helpers_post_init
+from src import helpers_post_init, matching, render
+from src.profiling import tracer, DELAY, USER
+from src.session import terminal
 
 
-def yesno(msg) -> bool:
-    return input('(y/n) ' + msg + '\n> ').lower().strip().startswith(('y','ы','я','у'))
+async def yesno(msg) -> bool:
+    return (await terminal.input('(y/n) ' + msg + '\n> ')).lower().strip().startswith(('y','ы','я','у'))
 
-def get_ans(asked, answer, flags) -> bool:
-    def ask(asked):
+async def get_ans(asked, answer, flags, matcher: matching.AnswerMatcher = None) -> bool or None:
+    # returns None if the time given by --time-limit ran out
+    async def ask(asked):
         sentence = flags.ask_sentence.replace('<>', asked)
-        return input(sentence + '\n> ') if not AUTO_ANSWER else ''
+        with tracer.span('answer', USER, asked=asked):
+            return await terminal.input(sentence + '\n> ', flags.time_limit or None) if not AUTO_ANSWER else ''
 
     # ans is the *user's* answer
     # answer is the *correct* answer
-    ans = ask(asked).strip()
+    ans = await ask(asked)
+    if ans is None:
+        return None
+    ans = ans.strip()
 
-    if not flags.case_sensitive:
-        ans = ans.lower()
-        answer = answer.lower()
+    # the answer should be compiled beforehand (see matching.compile_answers)
+    if matcher is None:
+        matcher = matching.compile_answer(answer, flags)
 
-    if ans == answer:
+    with tracer.span('check answer'):
+        found = matcher.matches(ans)
+    if found:
         return True
     else:
         if flags.ask_for_typos and not AUTO_ANSWER and ans:
-            if yesno("Was this a typo ?"):
-                return get_ans(asked, answer, flags)
+            if await yesno("Was this a typo ?"):
+                return await get_ans(asked, answer, flags, matcher)
         return False
 
 
-def question_end(flags, found, asked):
+async def question_end(flags, found, asked, next_screen: render.Screen = None):
+    # next_screen is the next question's, written as soon as the screen is cleared
     if found:
         wait = False
         predelay = 0.5
@@ -42,11 +51,14 @@ def question_end(flags, found, asked):
         delay = helpers_post_init.get_reading_time(asked, time_to_read_letter=flags.read_time)
 
     if flags.clear_screen:
-        time.sleep(predelay)
-        helpers_post_init.clear_screen(wait=wait, mode=flags.clear_mode, delay=delay)
+        # pressing a key skips the delays
+        with tracer.span('question_end sleep', DELAY):
+            await terminal.pause(predelay)
+        await helpers_post_init.clear_screen(wait=wait, mode=flags.clear_mode, delay=delay, next_screen=next_screen)
     else:
-        print('')
-        print('-' * 16)
+        render.Screen().add().add('-' * 16).flush()
+        if next_screen:
+            next_screen.flush()
 
 def selection(msg: str, choices: list or tuple, shortcuts=True, shortcuts_level: int = 1) -> str:
     """
@@ -0,0 +1,98 @@
+import array
+import json
+import mmap
+import os
+import struct
+import sys
+
+from src import items
+
+# Binary decks hold the flags and the ItemStore of a learndata file, so that they can be memory-mapped instead of parsed
+# (see `run.py export` and `run.py import`). They're made of:
+# - a header: magic, format version, number of sections, size of the flags
+# - the offset index: the (offset, size) of each section, in the order of SECTIONS
+# - the flags (resolved: the preset's flags are included), as UTF-8 JSON
+# - the sections, aligned on 8 bytes: the ItemStore's arrays (little-endian), and its string table last
+MAGIC = b'LITD'
+VERSION = 2
+HEADER = struct.Struct('<4sHHI')
+SECTION = struct.Struct('<QQ')
+SECTIONS = (*items.ARRAYS, '_text')
+ALIGNMENT = 8
+
+EXTENSION = '.deck'
+
+
+def is_deck(filepath: str) -> bool:
+    try:
+        with open(filepath, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _padding(offset: int) -> bytes:
+    return b'\0' * (-offset % ALIGNMENT)
+
+
+def write(filepath: str, data: items.ItemStore, flags: dict) -> None:
+    state = data.state()
+    if sys.byteorder != 'little':
+        for name, typecode in items.ARRAYS.items():
+            column = array.array(typecode, state[name])
+            column.byteswap()
+            state[name] = column.tobytes()
+
+    encoded_flags = json.dumps(flags, ensure_ascii=False).encode('utf8')
+    offset = HEADER.size + SECTION.size * len(SECTIONS) + len(encoded_flags)
+    index = list()
+    for name in SECTIONS:
+        offset += len(_padding(offset))
+        index.append((offset, len(state[name])))
+        offset += len(state[name])
+
+    # write to a temporary file then rename it, so that an interrupted write can't leave a broken deck behind
+    with open(filepath + '.tmp', 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(SECTIONS), len(encoded_flags)))
+        for section in index:
+            f.write(SECTION.pack(*section))
+        f.write(encoded_flags)
+        for name in SECTIONS:
+            f.write(_padding(f.tell()))
+            f.write(state[name])
+    os.replace(filepath + '.tmp', filepath)
+
+
+def load(filepath: str) -> tuple:
+    """
+    Get the (data, flags) of a binary deck. data is a MappedItemStore of the memory-mapped file:
+    only the items that are used are read from the disk.
+    Raises ValueError if the file isn't a binary deck, or was written by an incompatible version.
+    """
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            raise ValueError(f'"{filepath}" is not a binary deck')
+        # the mapping stays open after the file is closed, as long as the store uses it
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, count, flags_size = HEADER.unpack_from(mm)
+    if magic != MAGIC:
+        raise ValueError(f'"{filepath}" is not a binary deck')
+    if version != VERSION or count != len(SECTIONS):
+        raise ValueError(f'"{filepath}" was written by an incompatible version (format {version})')
+
+    start = HEADER.size + SECTION.size * count
+    index = [SECTION.unpack_from(mm, HEADER.size + SECTION.size * i) for i in range(count)]
+    if any(offset + size > len(mm) for offset, size in index):
+        raise ValueError(f'"{filepath}" is truncated')
+    flags = json.loads(mm[start:start + flags_size].decode('utf8'))
+
+    if sys.byteorder == 'little':
+        view = memoryview(mm)
+        data = items.MappedItemStore.from_buffers({name: view[offset:offset + size] for name, (offset, size) in zip(SECTIONS, index)})
+    else:
+        state = {name: mm[offset:offset + size] for name, (offset, size) in zip(SECTIONS, index)}
+        data = items.ItemStore.from_state(state)
+        for name in items.ARRAYS:
+            getattr(data, name).byteswap()
+    return data, flags
@@ -0,0 +1,75 @@
+import logging as log
+import os
+
+from src import filters, helpers
+
+
+def blacklist_path(learndata_file: str) -> str:
+    return helpers.sidecar_path(learndata_file, 'blacklist')
+
+
+def read_blacklist(path: str) -> tuple:
+    """
+    Read a blacklist file, that contains one item per line.
+    Returns the items and whether the file is intact: if the last line doesn't end with a newline,
+    writing it was interrupted, and it is ignored.
+    """
+    items = list()
+    intact = True
+    try:
+        with open(path, 'r', encoding='utf8', newline='\n') as f:
+            for line in f:
+                if line.endswith('\n'):
+                    items.append(line[:-1])
+                else:
+                    intact = False
+    except FileNotFoundError:
+        pass
+    return items, intact
+
+
+def write_atomic(path: str, text: str) -> None:
+    # write to a temporary file then rename it, so that the file is either fully written or left untouched
+    with open(path + '.tmp', 'w', encoding='utf8', newline='\n') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + '.tmp', path)
+
+
+def add_to_blacklist(path: str, items: list, known: list = ()) -> list:
+    """
+    Add items to a blacklist file, skipping the ones that are already in it or in `known`.
+    Only the new items are appended. The file is only rewritten (atomically) when it doesn't exist yet
+    or when its last line was cut by an interrupted write.
+    Returns the items that were added.
+    """
+    existing, intact = read_blacklist(path)
+    blacklisted = set(existing) | set(known)
+    new = [item for item in dict.fromkeys(items) if item not in blacklisted]
+    if not new:
+        return new
+
+    lines = ''.join(item + '\n' for item in new)
+    if intact and os.path.isfile(path):
+        # a single write, so that an interrupted one can only cut the last line
+        with open(path, 'a', encoding='utf8', newline='\n') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+    else:
+        if not intact:
+            log.warning(f'The last line of {path} was incomplete, and was removed')
+        write_atomic(path, ''.join(item + '\n' for item in existing) + lines)
+    return new
+
+
+def merge_blacklist(flags: dict, learndata_file: str) -> dict:
+    # add the items of the learndata file's blacklist file to its --blacklist.
+    # They're items, not patterns: an item that starts with "glob:" or "re:" only matches itself
+    items, _ = read_blacklist(blacklist_path(learndata_file))
+    items = list(map(filters.literal, items))
+    declared = flags.get('blacklist', [])
+    if items and type(declared) == list:
+        flags = {**flags, 'blacklist': list(dict.fromkeys(declared + items))}
+    return flags
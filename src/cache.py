@@ -0,0 +1,88 @@
+import hashlib
+import logging as log
+import marshal
+import mmap
+import os
+import struct
+
+from src import items
+from src.consts import CACHE_DIR, PRESETS_FILE
+
+# Cache files are made of a fixed-size header followed by the marshal-ed (data's ItemStore.state(), flags) tuple.
+# The header describes the state of the learndata and presets files at the time they were parsed:
+# magic, format version, marshal version, learndata mtime (ns), learndata size, presets mtime (ns), presets size,
+# learndata content hash
+MAGIC = b'LITC'
+VERSION = 4
+HEADER = struct.Struct('<4sHHqqqq32s')
+
+
+def cache_path(filepath: str) -> str:
+    name = hashlib.blake2b(os.path.abspath(filepath).encode('utf8'), digest_size=16).hexdigest()
+    return os.path.join(CACHE_DIR, name + '.bin')
+
+
+def file_hash(filepath: str) -> bytes:
+    digest = hashlib.blake2b(digest_size=32)
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def presets_signature() -> tuple:
+    try:
+        stat = os.stat(PRESETS_FILE)
+    except OSError:
+        return -1, -1
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load(filepath: str) -> tuple or None:
+    """
+    Get the parsed (data, flags) of a learndata file from the cache.
+    Returns None if there's no cache for this file, or if the file or the presets changed since it was cached.
+    """
+    try:
+        stat = os.stat(filepath)
+        with open(cache_path(filepath), 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if len(mm) < HEADER.size:
+                return None
+            magic, version, marshal_version, mtime, size, presets_mtime, presets_size, digest = HEADER.unpack_from(mm)
+            if (magic, version, marshal_version) != (MAGIC, VERSION, marshal.version):
+                return None
+            if (presets_mtime, presets_size) != presets_signature() or size != stat.st_size:
+                return None
+            # the file was touched but has the same size: only trust the cache if its contents didn't change
+            if mtime != stat.st_mtime_ns and digest != file_hash(filepath):
+                return None
+
+            with memoryview(mm) as view, view[HEADER.size:] as payload:
+                state, flags = marshal.loads(payload)
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+
+    log.debug(f'Loaded "{filepath}" from the cache')
+    return items.ItemStore.from_state(state), flags
+
+
+def store(filepath: str, data: items.ItemStore, flags: dict, stat: os.stat_result, digest: bytes) -> None:
+    """
+    Cache the parsed (data, flags) of a learndata file.
+    `stat` and `digest` must describe the file *before* it was parsed, so that changes made while parsing invalidate the cache.
+    Nothing is cached if CACHE_DIR's parent directory (LEARNDATA_ROOT) doesn't exist.
+    """
+    if not os.path.isdir(os.path.dirname(CACHE_DIR)):
+        return
+
+    header = HEADER.pack(MAGIC, VERSION, marshal.version, stat.st_mtime_ns, stat.st_size, *presets_signature(), digest)
+    path = cache_path(filepath)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # write to a temporary file then rename it, so that an interrupted write can't leave a broken cache behind
+        with open(path + '.tmp', 'wb') as f:
+            f.write(header)
+            f.write(marshal.dumps((data.state(), flags)))
+        os.replace(path + '.tmp', path)
+    except (OSError, ValueError) as e:
+        log.debug(f'Could not cache "{filepath}": {e}')
@@ -23,15 +23,15 @@ TIME_TO_READ_LETTER = 0.25
 SYNTAX = {
     'flags'   : re.compile(r'--([\w][\w\-]*)(?:[ =](.+))?'),  # [0]: trues, [1]: falses
     'booleans': (('true', 'yes', 'on'), ('false', 'no', 'off')),
-    'lists'   : re.compile(r'\[([,\w ]+)\]'),
+    'lists'   : re.compile(r'\[(.+)\]\s*$'),
     'comments': re.compile(r'(?://)|(?:#) (.+)')
 }
 
-T = helpers.get_translations(LANGUAGE)
+T = helpers.Translations(LANGUAGE)
 
 FLAGS_DEFAULTS = {
-    # 'and-syntax'                 : '&&',
-    # 'or-syntax'                  : '||',
+    'and-syntax'                 : '&&',
+    'or-syntax'                  : '||',
     # 'no-colors'                  : False,
     'always-show-grade'          : False,
     'ask-for'                    : 'values',
@@ -43,17 +43,25 @@ FLAGS_DEFAULTS = {
     'clear-mode'                 : 'delay',
     'clear-screen'               : 'off',
     'debug'                      : DEBUG,
+    'delimiter'                  : 'auto',
+    'fold-accents'               : False,
     'good-grade'                 : 0.5,
     'grade-max'                  : 100,
     'grade-precision'            : 2,
     'header'                     : '---- <> ----',
     'header-color'               : 'cyan',
+    'key-column'                 : 1,
     'read-time'                  : 0.25, # todo rename to --show-answer
+    'record-stats'               : False,
     'show-answer-in-testing-mode': True,
     'show-items-count'           : DEBUG,
     'show-remaining-items-count' : False,
+    'skip-first-row'             : False,
     'strict-learn-about'         : True,
+    'time-limit'                 : 0,
     'title'                      : 'untitled',
+    'typo-tolerance'             : 0,
+    'value-column'               : 2,
     'warn-unknown-flags'         : True,
     'whitelist'                  : [],
     'blacklist'                  : [],
@@ -64,30 +72,38 @@ FLAGS_DEFAULTS = {
 # FLAGS_TYPES = {flag: type(default) for flag, default in FLAGS_DEFAULTS.items()}
 
 FLAGS_TYPES = {
-    # 'and-syntax'                 : str,
-    # 'or-syntax'                  : str,
+    'and-syntax'                 : str,
+    'or-syntax'                  : str,
     # 'no-colors'                  : bool,
     'always-show-grade'          : bool,
     'ask-for'                    : ('values', 'both', 'keys'),
     'ask-for-typos'              : bool,
-    'ask-order'                  : ('random', 'keep', "alphabetical"),
+    'ask-order'                  : ('random', 'keep', "alphabetical", 'due', 'hardest'),
     'ask-sentence'               : str,
     'auto-blacklist'             : bool,
     'case-sensitive'             : bool,
     'clear-mode'                 : ('confirm', 'delay'),
     'clear-screen'               : (True, 'delay', False),
     'debug'                      : bool,
+    'delimiter'                  : ('auto', 'comma', 'semicolon', 'tab', 'pipe'),
+    'fold-accents'               : bool,
     'good-grade'                 : float,
     'grade-max'                  : int,
     'grade-precision'            : int,
     'header'                     : str,
     'header-color'               : ('white', 'red', 'yellow', 'green', 'cyan', 'blue', 'magenta'),
+    'key-column'                 : int,
     'read-time'                  : float,
+    'record-stats'               : bool,
     'show-answer-in-testing-mode': bool,
     'show-items-count'           : bool,
     'show-remaining-items-count' : bool,
+    'skip-first-row'             : bool,
     'strict-learn-about'         : bool,
+    'time-limit'                 : int,
     'title'                      : str,
+    'typo-tolerance'             : int,
+    'value-column'               : int,
     'warn-unknown-flags'         : bool,
     'whitelist'                  : list,
     'blacklist'                  : list,
@@ -100,6 +116,8 @@ if DATA_FILE.startswith('<no_append_root>'):
 else:
     DATA_FILE = os.path.abspath(os.path.join(LEARNDATA_ROOT, DATA_FILE))
 PRESETS_FILE = os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), PRESETS_FILE))
+# parsed learndata files are cached here, see src/cache.py
+CACHE_DIR = os.path.join(LEARNDATA_ROOT, '.cache')
 
 # available logging levels
 LOGGING_LEVELS = ["FATAL", "ERROR", "WARNING", "INFO", "DEBUG"]
@@ -0,0 +1,79 @@
+import collections
+import concurrent.futures
+import glob
+import os
+
+from src import items, parser
+from src.profiling import traced
+
+# below this number of files, decks are parsed one by one: starting worker processes would take longer
+PARALLEL_THRESHOLD = 8
+
+
+def is_pattern(path: str) -> bool:
+    return any(char in path for char in '*?[')
+
+
+def find_decks(path: str) -> tuple:
+    """
+    Get the learndata files of a directory (recursively) or matching a glob pattern, sorted by path.
+    Returns the directory that holds them (used to store data about the whole session, like reviews)
+    and the files. The files list is empty if `path` isn't a directory or a pattern.
+    Hidden files are ignored, so that files like .<file>.blacklist aren't considered decks.
+    """
+    if os.path.isdir(path):
+        directory = path.rstrip('/\\')
+        files = glob.glob(os.path.join(directory, '**', '*.txt'), recursive=True)
+    elif is_pattern(path):
+        # the directory is the part of the pattern before the first wildcard
+        directory = os.path.dirname(path)
+        while is_pattern(directory):
+            directory = os.path.dirname(directory)
+        files = glob.glob(path, recursive=True)
+    else:
+        return path, []
+    return directory, sorted(file for file in files if os.path.isfile(file))
+
+
+@traced()
+def load_decks(files: list) -> list:
+    # parse the files on a process pool if there are enough of them
+    if len(files) < PARALLEL_THRESHOLD:
+        return list(map(parser.parse_file, files))
+    workers = os.cpu_count() or 1
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(parser.parse_file, files, chunksize=max(1, len(files) // (workers * 4))))
+
+
+def merge_decks(files: list, parsed: list) -> tuple:
+    """
+    Merge parsed decks into a single session.
+    Each deck is filtered with its own flags (--whitelist, --blacklist and --ask-for),
+    and the flags of the first deck are used for the session (eg. --ask-order, --title).
+    Returns the session's data, flags, the deck each question comes from along with the deck's keys it is about
+    ({question: (deck file, [keys])}, the keys differ from the question with --ask-for values)
+    and the number of items before filtering.
+    """
+    data = items.ItemStore()
+    sources = dict()
+    session_flags = None
+    full_data_count = 0
+    for file, (deck_data, deck_flags) in zip(files, parsed):
+        deck_flags = parser.FlagsParser(deck_flags)
+        if session_flags is None:
+            session_flags = deck_flags
+        full_data_count += len(deck_data)
+        deck_view = parser.filter_learndata(deck_data, deck_flags)
+        data.extend((item, answer) for item in deck_view for answer in deck_view.answers(item))
+        sources.update((question, (file, deck_view.items_of(question))) for question in deck_view)
+
+    return parser.order_learndata(data.view(), session_flags), session_flags, sources, full_data_count
+
+
+def group_by_deck(questions: list, sources: dict) -> dict:
+    # {deck file: [keys of the questions]}
+    grouped = collections.defaultdict(list)
+    for question in questions:
+        deck_file, keys = sources[question]
+        grouped[deck_file].extend(keys)
+    return grouped
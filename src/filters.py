@@ -0,0 +1,54 @@
+import fnmatch
+import logging as log
+import re
+
+# prefixes of --whitelist and --blacklist entries that are patterns instead of items
+GLOB_PREFIX = 'glob:'
+REGEX_PREFIX = 're:'
+
+
+def literal(item: str) -> str:
+    # the entry that only matches item, even if it starts with a pattern prefix (eg. an item added by --auto-blacklist)
+    if item.startswith((GLOB_PREFIX, REGEX_PREFIX)):
+        return REGEX_PREFIX + re.escape(item)
+    return item
+
+
+class ItemFilter:
+    """
+    Compiled --whitelist or --blacklist.
+    Items are looked up in a set, and patterns are compiled once: into a single regex when that doesn't change what
+    they match, one by one otherwise (eg. with backreferences, whose group numbers joining would shift).
+    Entries starting with "glob:" are shell-style wildcards (eg. glob:*ing), and entries starting with "re:" are regular expressions.
+    Patterns must match the whole item.
+    """
+
+    def __init__(self, entries: list):
+        self.items = set()
+        self.patterns = list()
+        for entry in entries:
+            if entry.startswith(GLOB_PREFIX):
+                self.patterns.append(re.compile(fnmatch.translate(entry[len(GLOB_PREFIX):])))
+            elif entry.startswith(REGEX_PREFIX):
+                pattern = entry[len(REGEX_PREFIX):]
+                try:
+                    self.patterns.append(re.compile(pattern))
+                except re.error as e:
+                    log.warning(f'Invalid regular expression "{pattern}" ({e}), ignoring')
+            else:
+                self.items.add(entry)
+
+        # patterns can only be joined without groups, and without global flags such as (?i), which would apply to all of them
+        if len(self.patterns) > 1 and all(not pattern.groups and pattern.flags == re.UNICODE for pattern in self.patterns):
+            self.patterns = [re.compile('|'.join(f'(?:{pattern.pattern})' for pattern in self.patterns))]
+
+    def __bool__(self) -> bool:
+        return bool(self.items) or bool(self.patterns)
+
+    def __contains__(self, item: str) -> bool:
+        if item in self.items:
+            return True
+        # this runs for every key: most of the time, the patterns were joined into one
+        if len(self.patterns) == 1:
+            return self.patterns[0].fullmatch(item) is not None
+        return any(pattern.fullmatch(item) for pattern in self.patterns)
@@ -0,0 +1,146 @@
+import collections
+import concurrent.futures
+import csv
+import json
+import os
+
+from src import matching
+
+# name given to the answers of a sheet that doesn't have a student column
+DEFAULT_STUDENT = 'answers'
+
+
+def compute_grade(found_count: int, total: int, flags) -> float:
+    # the number of questions found (correctly answered) divided by the total number of questions,
+    # rounded to --grade-precision digits and converted to fit --grade-max
+    return round(found_count / total * flags.grade_max, flags.grade_precision)
+
+
+def grade_answers(data: dict, matchers: dict, answers: dict) -> tuple:
+    """
+    Grade answers ({asked: given answer}) like testing_loop does, without asking anything.
+    Items that weren't answered are considered wrong.
+    Returns the found and notfound items.
+    """
+    found = list()
+    notfound = list()
+    for asked in data.keys():
+        if matchers[asked].matches(answers.get(asked, '')):
+            found.append(asked)
+        else:
+            notfound.append(asked)
+    return found, notfound
+
+
+def read_answer_sheets(lines, default_student: str = DEFAULT_STUDENT) -> dict:
+    """
+    Read answer sheets from tab-separated lines: "student<TAB>item<TAB>answer", or "item<TAB>answer" for a single sheet,
+    whose student is default_student.
+    Returns {student: {item: answer}}
+    """
+    sheets = dict()
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if not line:
+            continue
+        columns = line.split('\t')
+        if len(columns) >= 3:
+            student, item, answer = columns[0], columns[1], '\t'.join(columns[2:])
+        else:
+            student, item, answer = default_student, columns[0], columns[1] if len(columns) > 1 else ''
+        sheets.setdefault(student, dict())[item] = answer
+    return sheets
+
+
+def grade_sheet(student: str, answers: dict, data: dict, matchers: dict, flags) -> dict:
+    found, notfound = grade_answers(data, matchers, answers)
+    return {
+        'student' : student,
+        'grade'   : compute_grade(len(found), len(data), flags),
+        'found'   : len(found),
+        'total'   : len(data),
+        'notfound': notfound,
+    }
+
+
+def grade_sheets(sheets: dict, data: dict, flags) -> list:
+    # the answers are compiled once for all the sheets
+    matchers = matching.compile_answers(data, flags)
+    return [grade_sheet(student, answers, data, matchers, flags) for student, answers in sheets.items()]
+
+
+# state of the worker processes of grade_directory, sent once to each of them by _init_worker
+_worker = dict()
+
+
+def _init_worker(data: dict, matchers: dict, flags) -> None:
+    _worker.update(data=data, matchers=matchers, flags=flags)
+
+
+def _grade_file(path: str) -> list:
+    # the file's name is the student's, unless the file has a student column
+    student = os.path.splitext(os.path.basename(path))[0]
+    with open(path, 'r', encoding='utf8') as f:
+        sheets = read_answer_sheets(f, default_student=student)
+    return [grade_sheet(student, answers, _worker['data'], _worker['matchers'], _worker['flags'])
+            for student, answers in sheets.items()]
+
+
+def sheet_files(directory: str) -> list:
+    # every file of the directory, except hidden ones
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if not name.startswith('.') and os.path.isfile(os.path.join(directory, name)))
+
+
+def grade_directory(directory: str, data: dict, flags, workers: int = None) -> list:
+    """
+    Grade every answer sheets file of a directory, spreading the files over a process pool.
+    The deck and its compiled answers are sent once to each worker process, and only file paths are sent for each task.
+    """
+    files = sheet_files(directory)
+    matchers = matching.compile_answers(data, flags)
+    workers = workers or os.cpu_count() or 1
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                initargs=(data, matchers, flags)) as pool:
+        chunks = pool.map(_grade_file, files, chunksize=max(1, len(files) // (workers * 4)))
+        return [result for chunk in chunks for result in chunk]
+
+
+def items_report(results: list, data: dict) -> list:
+    """
+    How often each item was failed, the most failed first.
+    Returns a list of {'item', 'errors', 'sheets', 'error_rate'} dicts.
+    """
+    errors = collections.Counter(item for result in results for item in result['notfound'])
+    report = [{
+        'item'      : item,
+        'errors'    : errors[item],
+        'sheets'    : len(results),
+        'error_rate': round(errors[item] / len(results), 4) if results else 0,
+    } for item in data.keys()]
+    report.sort(key=lambda row: -row['errors'])
+    return report
+
+
+def write_report(results: list, report: list, stream, output_format: str = 'json') -> None:
+    # results of grade_directory: per-item error rates, and the students' grades (in JSON only)
+    if output_format == 'csv':
+        writer = csv.writer(stream)
+        writer.writerow(('item', 'errors', 'sheets', 'error_rate'))
+        for row in report:
+            writer.writerow((row['item'], row['errors'], row['sheets'], row['error_rate']))
+    else:
+        json.dump({'items': report, 'students': results}, stream, ensure_ascii=False, indent=2)
+        stream.write('\n')
+
+
+def write_results(results: list, stream, output_format: str = 'json') -> None:
+    if output_format == 'csv':
+        writer = csv.writer(stream)
+        writer.writerow(('student', 'grade', 'found', 'total', 'notfound'))
+        for result in results:
+            writer.writerow((result['student'], result['grade'], result['found'], result['total'],
+                             '\n'.join(result['notfound'])))
+    else:
+        json.dump(results, stream, ensure_ascii=False, indent=2)
+        stream.write('\n')
@@ -3,17 +3,19 @@ import os
 import sys
 import time
 import shutil
+import signal
 
-import colorama
-from termcolor import colored as termcolor_colored
+# colorama and termcolor are imported by colored() the first time it's called, to keep startup fast
+termcolor_colored = None
 
 
 def pprint_dict(data: dict, pad: int = 1, sep: str = ': ', column_names: tuple = None, return_str: bool = False):
-    k_maxlen = max([len(str(e)) for e in data.keys()])
-    v_maxlen = max([len(str(e)) for e in data.values()])
+    # data is only gone through once: the items of an ItemView are decoded each time they're read
+    data = list(data.items())
+    k_maxlen = max([len(str(k)) for k, v in data])
+    v_maxlen = max([len(str(v)) for k, v in data])
     ret = list()
 
-    data = list(data.items())
     if column_names:
         data.insert(0, column_names)
         data.insert(1, ('-' * k_maxlen, '-' * v_maxlen))
@@ -48,8 +50,10 @@ def path_contract_user(path: str) -> str:
     return path.replace(os.path.expanduser('~'), '~', 1)
 
 
-def invert_dict_mapping(dikt: dict) -> dict:
-    return {v: k for k, v in dikt.items()}
+def sidecar_path(path: str, suffix: str) -> str:
+    # hidden file stored next to `path`, eg. russian/.vocabulary.txt.reviews
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, f'.{name}.{suffix}')
 
 
 def path_go_up(path: str, times: int = 1) -> str:
@@ -67,8 +71,35 @@ def get_translations(lang='en'):
     return json.loads(raw)
 
 
+class Translations:
+    """
+    Translations for a language, loaded from the translations file the first time one of them is needed.
+    """
+
+    def __init__(self, lang='en'):
+        self.lang = lang
+        self._translations = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._translations is not None
+
+    def __getitem__(self, key: str) -> str:
+        if self._translations is None:
+            self._translations = get_translations(self.lang)
+        return self._translations[key]
+
+
+def init_colors():
+    global termcolor_colored
+    if termcolor_colored is None:
+        import colorama
+        from termcolor import colored as termcolor_colored
+        colorama.init()
+
+
 def colored(*args, **kwargs):
-    colorama.init()
+    init_colors()
     return termcolor_colored(*args, **kwargs)
 
 
@@ -87,5 +118,26 @@ def delete_prev_line():
     sys.stdout.write("\033[K")  # clear line
 
 
+# terminal size, cached until the terminal gets resized (see term_size)
+_term_size = None
+_watching_resizes = False
+
+
+def _forget_term_size(signum, frame):
+    global _term_size
+    _term_size = None
+
+
 def term_size():
-    return shutil.get_terminal_size()
\ No newline at end of file
+    global _term_size, _watching_resizes
+    if not _watching_resizes:
+        # get notified when the terminal is resized. This is only possible on
+        # platforms that have SIGWINCH, from the main thread. Otherwise, the size isn't cached
+        try:
+            signal.signal(signal.SIGWINCH, _forget_term_size)
+            _watching_resizes = True
+        except (AttributeError, ValueError):
+            return shutil.get_terminal_size()
+    if _term_size is None:
+        _term_size = shutil.get_terminal_size()
+    return _term_size
@@ -1,17 +1,25 @@
 from src.helpers import cprint
 from src.consts import TIME_TO_READ_LETTER, T
-import os
-import time
+from src import render
+from src.profiling import tracer, DELAY, USER
+from src.session import terminal
 
-def clear_screen(wait=True, mode='confirm', delay=5):
+async def clear_screen(wait=True, mode='confirm', delay=5, next_screen: render.Screen = None):
     if wait:
         if mode == 'confirm':
-            input(T['press_enter_to_continue'])  # press enter to get to the next ask
+            with tracer.span('confirm', USER):
+                await terminal.input(T['press_enter_to_continue'])  # press enter to get to the next ask
         elif mode == 'delay':
-            time.sleep(delay)
+            # pressing a key skips the delay
+            with tracer.span('reading time sleep', DELAY):
+                await terminal.pause(delay)
         else:
             cprint(f"Unreachable code! helpers_post_init.clear_screen's 'mode' argument is set to {mode}", 'red')
-    os.system('clear')
+    # the next question (if it's ready) is written along with the clearing sequence
+    screen = render.Screen().clear()
+    if next_screen:
+        screen.add(next_screen.render(), end='')
+    screen.flush()
 
 def get_reading_time(word, time_to_read_letter=TIME_TO_READ_LETTER, time_to_learn_word=2):
     # ignore whitespace
@@ -0,0 +1,123 @@
+import csv
+import functools
+import html
+import itertools
+import logging as log
+import os
+import re
+
+from src import parser
+from src.consts import *
+
+# values of --delimiter. With auto, the delimiter depends on the file's extension (or on the #separator header of Anki exports)
+DELIMITERS = {'comma': ',', 'semicolon': ';', 'tab': '\t', 'pipe': '|'}
+EXTENSIONS = {'.csv': 'comma', '.tsv': 'tab', '.tab': 'tab'}
+
+# headers at the top of Anki's plain text exports, eg. #separator:tab, #html:true or #deck column:3.
+# Only the names Anki writes are accepted, so that comments like "# Chapter 1: greetings" aren't mistaken for them
+ANKI_HEADER = re.compile(r'#(separator|html|tags|columns|notetype|deck|guid column|notetype column|deck column|tags column)'
+                         r':(.*)', re.IGNORECASE)
+ANKI_SEPARATORS = {'comma': ',', 'semicolon': ';', 'tab': '\t', 'space': ' ', 'pipe': '|', 'colon': ':'}
+# columns of Anki exports that aren't fields of the notes
+ANKI_METADATA = ('guid column', 'notetype column', 'deck column', 'tags column')
+HTML_LINE_BREAK = re.compile(r'<br\s*/?>|</?div>', re.IGNORECASE)
+HTML_TAG = re.compile(r'<[^>]*>')
+
+
+def reader_for(filepath: str):
+    """
+    The function that reads a file's lines, if it's a CSV or TSV file or an Anki export, or None for learndata files.
+    Files read by readers must be opened with newline=''.
+    """
+    extension = os.path.splitext(filepath)[1].lower()
+    if extension in EXTENSIONS:
+        return functools.partial(iter_table, delimiter=EXTENSIONS[extension])
+    # Anki's exports are .txt files that start with headers (after the flags, if any were added)
+    # spreadsheets often start their exports with a byte order mark
+    with open(filepath, 'r', encoding='utf-8-sig') as f:
+        for line in f:
+            if not SYNTAX['flags'].match(line):
+                return functools.partial(iter_table, delimiter='tab') if ANKI_HEADER.match(line) else None
+    return None
+
+
+def strip_html(field: str) -> str:
+    field = HTML_TAG.sub('', HTML_LINE_BREAK.sub(' ', field))
+    return ' '.join(html.unescape(field).split())
+
+
+def column_flag(flags: dict, flag: str) -> int:
+    # 0-based column index of --key-column or --value-column (FlagsParser warns about illegal values later on)
+    column = flags.get(flag)
+    if type(column) != int or column < 1:
+        column = FLAGS_DEFAULTS[flag]
+    return column - 1
+
+
+def iter_table(lines, delimiter: str = 'comma'):
+    """
+    Reads a CSV or TSV file, or an Anki plain text export, one row at a time.
+    Yields the same ('preset', name), ('flag', name, value) and ('item', key, value) tuples as parser.iter_parse.
+    Learndata flags can be declared on the first lines (eg. --key-column 2), before the rows and Anki's headers.
+    The columns of the items are chosen with --key-column and --value-column, and the delimiter with --delimiter.
+    """
+    lines = iter(lines)
+    flags = dict()
+    preset = None
+    headers = dict()
+    for line in lines:
+        stripped = line.rstrip('\r\n')
+        match = SYNTAX['flags'].match(stripped)
+        header = ANKI_HEADER.match(stripped)
+        if match:
+            flag, val = match.group(1), match.group(2)
+            if flag == 'preset':
+                preset = val
+                yield 'preset', val
+                continue
+            val = True if val is None else parser.parse_flag_type(val)
+            if val is not None:
+                flags[flag] = val
+                yield 'flag', flag, val
+        elif header:
+            headers[header.group(1).strip().lower()] = header.group(2).strip()
+        else:
+            lines = itertools.chain((line,), lines)
+            break
+    else:
+        return
+
+    # the preset's flags are overriden by the file's ones. parser.parse logs unknown presets
+    flags = {**(parser.preset_registry.presets() or {}).get(preset, {}), **flags}
+    if flags.get('delimiter', 'auto') in DELIMITERS:
+        delimiter = DELIMITERS[flags['delimiter']]
+    elif 'separator' in headers:
+        separator = headers['separator']
+        delimiter = ANKI_SEPARATORS.get(separator.lower(), separator[:1] or '\t')
+    else:
+        delimiter = DELIMITERS[delimiter]
+    key_column, value_column = column_flag(flags, 'key-column'), column_flag(flags, 'value-column')
+    # Anki's guid, notetype, deck and tags columns are skipped: --key-column and --value-column are field numbers
+    metadata = sorted((int(headers[name]) - 1 for name in ANKI_METADATA if headers.get(name, '').isdigit()), reverse=True)
+    html_fields = headers.get('html', '').lower() == 'true'
+
+    rows = csv.reader(lines, delimiter=delimiter, skipinitialspace=True)
+    if flags.get('skip-first-row') is True:
+        next(rows, None)
+    skipped = 0
+    for row in rows:
+        for column in metadata:
+            if column < len(row):
+                del row[column]
+        if max(key_column, value_column) >= len(row) or not row[key_column]:
+            # empty lines, or rows that don't have enough columns
+            skipped += bool(row)
+            continue
+        key, value = row[key_column], row[value_column]
+        if html_fields:
+            key, value = strip_html(key), strip_html(value)
+        yield 'item', key, value
+
+    if skipped:
+        log.warning(f'Skipped {skipped} row{"s" if skipped != 1 else ""} without a key in column {key_column + 1} '
+                    f'or without a column {value_column + 1}')
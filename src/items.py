@@ -0,0 +1,496 @@
+import array
+import collections
+import collections.abc
+import itertools
+import operator
+import random
+
+# shown between the correct answers of a question that has several of them
+ANSWERS_SEPARATOR = ' / '
+
+# ends of the chains of equal strings, and strings that aren't found
+NONE = -1
+# number of pairs that ItemStore.extend adds at once
+EXTEND_CHUNK = 4096
+
+# typecode of each of ItemStore's arrays
+ARRAYS = {
+    '_offsets' : 'I',
+    '_first'   : 'i',
+    '_next'    : 'i',
+    '_keys'    : 'i',
+    '_values'  : 'i',
+    '_sorted'  : 'i',
+}
+
+
+class ItemStore(collections.abc.Mapping):
+    """
+    Learndata items, indexed in both directions: a key can have several values, and a value several keys
+    (eg. when a key is declared twice in a learndata file). Every (key, value) pair is kept, identical pairs only once.
+    As a mapping, each key is mapped to its values, joined by ANSWERS_SEPARATOR.
+
+    So that big decks stay small in memory, there are no dicts or str objects per item. Pairs are stored in the order
+    they were added, UTF-8 encoded, in a single buffer: string 2 * i is the key of pair i, and string 2 * i + 1 its value.
+    Everything else is an array of integers:
+    - when some strings are equal, each string points to the first one equal to it, which is the id of the question it
+      asks, and to the next one, so that the pairs of a key or of a value are found by following a chain
+    - the strings are found by a binary search in their ids, sorted by text, which are only sorted when one is looked up
+    """
+
+    def __init__(self, pairs=()):
+        # string i is text[offsets[i]:offsets[i + 1]]
+        self._text = bytearray()
+        for name, typecode in ARRAYS.items():
+            setattr(self, name, array.array(typecode))
+        self._offsets.append(0)
+        self.extend(pairs)
+
+    # ---strings---
+
+    def _count(self) -> int:
+        return len(self._offsets) - 1
+
+    def _str(self, string: int) -> str:
+        return self._text[self._offsets[string]:self._offsets[string + 1]].decode('utf8')
+
+    def _decoded(self, strings: range = None) -> list:
+        # the strings of a range of ids (every string by default), decoded at once
+        if strings is None:
+            strings = range(self._count())
+        starts = self._offsets[strings.start:strings.stop:strings.step]
+        ends = self._offsets[strings.start + 1:strings.stop + 1:strings.step]
+        text = str(self._text, 'utf8')
+        if len(text) == len(self._text):
+            return list(map(text.__getitem__, map(slice, starts, ends)))
+        # offsets count bytes, not characters
+        with memoryview(self._text) as buffer:
+            return list(map(str, map(buffer.__getitem__, map(slice, starts, ends)), itertools.repeat('utf8')))
+
+    def _first_of(self, string: int) -> int:
+        return self._first[string] if self._first else string
+
+    def _occurrences(self, string: int) -> list:
+        # the strings equal to the first occurrence of a string, in order
+        if not self._next:
+            return [string]
+        strings = list()
+        while string != NONE:
+            strings.append(string)
+            string = self._next[string]
+        return strings
+
+    def _lookup_index(self):
+        # the first occurrences of the strings, sorted by text
+        if self._sorted is None:
+            count = self._count()
+            strings = self._decoded()
+            first = itertools.compress(range(count), map(operator.eq, self._first, range(count))) if self._first else range(count)
+            self._sorted = array.array('i', sorted(first, key=strings.__getitem__))
+        return self._sorted
+
+    def id_of(self, string: str) -> int:
+        # the first occurrence of a string, or NONE
+        index = self._lookup_index()
+        low, high = 0, len(index)
+        while low < high:
+            middle = (low + high) // 2
+            if self._str(index[middle]) < string:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(index) and self._str(index[low]) == string:
+            return index[low]
+        return NONE
+
+    def _ids_of(self, strings) -> list:
+        # the id_of of each string. Many of them are found at once with a dict of every string instead
+        strings = list(strings)
+        count = self._count()
+        if len(strings) * 16 < count:
+            return list(map(self.id_of, strings))
+        table = dict(zip(self._decoded(), self._first or range(count)))
+        return list(map(table.get, strings, itertools.repeat(NONE)))
+
+    def _strings_as(self, role: int):
+        # the first occurrences of the keys (role 0) or values (role 1), in the order they are first used as such
+        if not self._first:
+            # all the strings are different: string 2 * i is the key of pair i, and string 2 * i + 1 its value
+            return range(role, self._count(), 2)
+        if self._keys is None:
+            self._keys = array.array('i', dict.fromkeys(self._first[0::2]))
+            self._values = array.array('i', dict.fromkeys(self._first[1::2]))
+        return self._values if role else self._keys
+
+    # ---pairs---
+
+    def add(self, key: str, value: str) -> None:
+        self.extend(((key, value),))
+
+    def extend(self, pairs) -> None:
+        # this runs for all the items of the learndata files, so as little as possible is done in Python for each of them.
+        # Pairs are added EXTEND_CHUNK at a time, and the first occurrence of each string is found with a dict
+        # that only lasts as long as the call
+        count = self._count()
+        first = dict(zip(self._decoded(), self._first or range(count))) if count else dict()
+        # the last occurrence of the repeated strings
+        last = dict()
+        pairs = iter(pairs)
+        while True:
+            chunk = list(itertools.islice(pairs, EXTEND_CHUNK))
+            if not chunk:
+                break
+            self._extend_chunk(chunk, first, last)
+        # the indexes are made again when they're needed
+        self._keys = self._values = self._sorted = None
+
+    def _extend_chunk(self, pairs: list, first: dict, last: dict) -> None:
+        strings = list(itertools.chain.from_iterable(pairs))
+        start, known = self._count(), len(first)
+        ids = list(map(first.setdefault, strings, itertools.count(start)))
+        # most strings are new: then each one was added to first
+        repeated = []
+        if len(first) - known != len(strings):
+            repeated = list(itertools.compress(itertools.count(start), map(operator.ne, ids, itertools.count(start))))
+        if repeated and any(map(operator.and_, map(operator.ne, ids[0::2], itertools.count(start, 2)),
+                                map(operator.ne, ids[1::2], itertools.count(start + 1, 2)))):
+            # the key and the value of some pairs were already added, maybe as a pair: identical pairs are only kept once
+            for string in itertools.compress(strings, map(operator.ge, ids, itertools.repeat(start))):
+                first.pop(string, None)
+            pairs = dict.fromkeys(zip(map(operator.itemgetter(0), pairs), map(operator.itemgetter(1), pairs)))
+            pairs = [(key, value) for key, value in pairs if not self._has_pair(first.get(key, NONE), first.get(value, NONE))]
+            strings = list(itertools.chain.from_iterable(pairs))
+            ids = list(map(first.setdefault, strings, itertools.count(start)))
+            repeated = list(itertools.compress(itertools.count(start), map(operator.ne, ids, itertools.count(start))))
+
+        if repeated and not self._first:
+            # the first string that isn't new
+            self._first = array.array('i', range(start))
+            self._next = array.array('i', [NONE]) * start
+        if repeated or self._first:
+            self._first.extend(ids)
+            self._next.extend(array.array('i', [NONE]) * len(ids))
+            for string in repeated:
+                first_string = ids[string - start]
+                previous = last.get(first_string)
+                if previous is None:
+                    previous = self._occurrences(first_string)[-1]
+                self._next[previous] = string
+                last[first_string] = string
+
+        text, offsets = self._text, self._offsets
+        joined = ''.join(strings)
+        if joined.isascii():
+            text.extend(joined.encode('ascii'))
+            lengths = map(len, strings)
+        else:
+            encoded = list(map(str.encode, strings))
+            text.extend(b''.join(encoded))
+            lengths = map(len, encoded)
+        # accumulate starts with the initial offset, which is already there
+        offsets.extend(itertools.islice(itertools.accumulate(lengths, initial=offsets[-1]), 1, None))
+
+    def _has_pair(self, key: int, value: int) -> bool:
+        if key == NONE or value == NONE:
+            return False
+        return any(not string & 1 and self._first_of(string + 1) == value for string in self._occurrences(key))
+
+    def values_of(self, key: str) -> list:
+        key = self.id_of(key)
+        if key == NONE:
+            return []
+        return [self._str(string + 1) for string in self._occurrences(key) if not string & 1]
+
+    def keys_of(self, value: str) -> list:
+        value = self.id_of(value)
+        if value == NONE:
+            return []
+        return [self._str(string - 1) for string in self._occurrences(value) if string & 1]
+
+    def pairs(self) -> collections.abc.Iterator:
+        count = self._count()
+        return zip(map(self._str, range(0, count, 2)), map(self._str, range(1, count, 2)))
+
+    def _questions_of(self, pairs: list, ask_for: str) -> list:
+        # the keys and/or values of some pairs (in order), ordered like the store's keys and values
+        questions = list()
+        for role in {'keys': [0], 'values': [1], 'both': [0, 1]}[ask_for]:
+            strings = dict.fromkeys(self._first_of(2 * pair + role) for pair in pairs)
+            if self._first:
+                # where each string is first used as a key (or as a value)
+                strings = sorted(strings, key=lambda string: next(
+                    occurrence for occurrence in self._occurrences(string) if occurrence & 1 == role))
+            questions += strings
+        return list(dict.fromkeys(questions))
+
+    def view(self, ask_for: str = 'keys', keep=None, keys=None) -> 'ItemView':
+        # a view of the items whose key passes keep(key), or of every item.
+        # With keys, only the items of these keys are used: they're looked up, instead of checking every key
+        used = order = None
+        if keys is not None:
+            pairs = set()
+            for key in self._ids_of(keys):
+                for string in self._occurrences(key) if key != NONE else ():
+                    if not string & 1:
+                        pairs.add(string >> 1)
+            used = bytearray(self._count() // 2)
+            for pair in pairs:
+                used[pair] = 1
+            # the questions are the strings of these pairs: the rest of the store isn't read (eg. of a memory-mapped deck)
+            order = self._questions_of(sorted(pairs), ask_for)
+        if keep is not None:
+            keys = self._strings_as(0)
+            names = self._decoded(keys) if isinstance(keys, range) else list(map(self._str, keys))
+            kept = bytearray(map(bool, map(keep, names)))
+            if self._first:
+                kept = set(itertools.compress(keys, kept))
+                kept = bytearray(map(kept.__contains__, self._first[0::2]))
+            used = kept if used is None else bytearray(map(min, used, kept))
+            order = None
+        return ItemView(self, ask_for, order, used)
+
+    # ---serialization (see cache.py and binary.py)---
+
+    def state(self) -> dict:
+        # the store's buffers, as bytes, with its indexes
+        self._strings_as(0)
+        self._lookup_index()
+        if self._keys is None:
+            self._keys, self._values = array.array('i'), array.array('i')
+        return {'_text': bytes(self._text), **{name: getattr(self, name).tobytes() for name in ARRAYS}}
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'ItemStore':
+        store = cls.__new__(cls)
+        store.__setstate__(state)
+        return store
+
+    def __getstate__(self) -> dict:
+        return self.state()
+
+    def __setstate__(self, state: dict):
+        self._text = bytearray(state['_text'])
+        for name, typecode in ARRAYS.items():
+            column = array.array(typecode)
+            column.frombytes(state[name])
+            setattr(self, name, column)
+
+    # ---mapping---
+
+    def __getitem__(self, key: str) -> str:
+        values = self.values_of(key)
+        if not values:
+            raise KeyError(key)
+        return values[0] if len(values) == 1 else ANSWERS_SEPARATOR.join(values)
+
+    def __contains__(self, key) -> bool:
+        key = self.id_of(key)
+        return key != NONE and any(not string & 1 for string in self._occurrences(key))
+
+    def __iter__(self):
+        return map(self._str, self._strings_as(0))
+
+    def __len__(self) -> int:
+        return len(self._strings_as(0))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ItemStore):
+            return {key: self.values_of(key) for key in self} == {key: other.values_of(key) for key in other}
+        return super().__eq__(other)
+
+    def __repr__(self) -> str:
+        return f'ItemStore({list(self.pairs())!r})'
+
+
+class MappedItemStore(ItemStore):
+    """
+    Read-only ItemStore whose buffers are used as they are instead of being copied, eg. memoryviews of a
+    memory-mapped binary deck (see binary.py). Only the parts of the buffers that are read are loaded,
+    and strings are only decoded when they're needed.
+    """
+
+    @classmethod
+    def from_buffers(cls, buffers: dict) -> 'MappedItemStore':
+        # buffers: like state(), but with memoryviews (or other buffers) instead of bytes
+        store = cls.__new__(cls)
+        store._text = memoryview(buffers['_text'])
+        for name, typecode in ARRAYS.items():
+            setattr(store, name, memoryview(buffers[name]).cast('B').cast(typecode))
+        return store
+
+    def _str(self, string: int) -> str:
+        return str(self._text[self._offsets[string]:self._offsets[string + 1]], 'utf8')
+
+    def extend(self, pairs) -> None:
+        raise TypeError('MappedItemStore is read-only')
+
+    def __reduce__(self):
+        # copies are regular stores
+        return ItemStore.from_state, (self.state(),)
+
+
+class ItemView(collections.abc.Mapping):
+    """
+    The questions asked about an ItemStore, in order, mapped to their correct answers (joined by ANSWERS_SEPARATOR).
+    Questions are the store's keys (answered by their values) if ask_for is 'keys', its values (answered by their keys)
+    if ask_for is 'values', or both.
+    A view is made of indexes over its store: the ids of its questions in order, and which of the store's pairs it uses.
+    Filtering, reordering or inverting a view gives another view of the same store, without copying any string.
+    """
+
+    def __init__(self, store: ItemStore, ask_for: str = 'keys', order=None, used: bytearray = None):
+        self.store = store
+        self.ask_for = ask_for
+        # used[pair] is 1 for the store's pairs that the view uses, or None if it uses all of them
+        self._used = used
+        # the ids of the questions in order
+        if order is None:
+            self._order = self._questions(ask_for)
+        else:
+            self._order = array.array('i', dict.fromkeys(order))
+        # whether each of the store's strings is one of the questions, made when a question is first looked up:
+        # views are made without going through the store's strings (eg. of a memory-mapped deck)
+        self._is_question = None
+
+    def _questions(self, ask_for: str):
+        # the store's keys and/or values, in order, that are part of a pair the view uses
+        store = self.store
+        roles = {'keys': [0], 'values': [1], 'both': [0, 1]}[ask_for]
+        questions = list()
+        for role in roles:
+            strings = store._strings_as(role)
+            if self._used is None:
+                questions.append(strings)
+            elif not store._first:
+                questions.append(itertools.compress(strings, self._used))
+            else:
+                used_strings = set(itertools.compress(store._first[role::2], self._used))
+                questions.append(itertools.compress(strings, map(used_strings.__contains__, strings)))
+        if ask_for != 'both':
+            return questions[0] if self._used is None else array.array('i', questions[0])
+        # a string can be both a key and a value
+        return array.array('i', dict.fromkeys(itertools.chain(*questions)))
+
+    def _answer_ids(self, question: int) -> list:
+        store, used = self.store, self._used
+        # the other string of the pairs the question is the key of, and then of the ones it's the value of
+        strings = [string for string in store._occurrences(question) if used is None or used[string >> 1]]
+        answers = list()
+        if self.ask_for != 'values':
+            answers += [store._first_of(string + 1) for string in strings if not string & 1]
+        if self.ask_for != 'keys':
+            answers += [store._first_of(string - 1) for string in strings if string & 1]
+        # a string can be both a value and a key of the same question
+        return list(dict.fromkeys(answers)) if self.ask_for == 'both' else answers
+
+    def _answer(self, question: int) -> str:
+        store = self.store
+        # most questions are in a single pair: the view uses it, since they are questions of the view
+        if not store._next or (store._next[question] == NONE and store._first[question] == question):
+            return store._str(question ^ 1)
+        answers = self._answer_ids(question)
+        if len(answers) == 1:
+            return store._str(answers[0])
+        return ANSWERS_SEPARATOR.join(map(store._str, answers))
+
+    def _id(self, question: str) -> int:
+        # the id of a question of the view, or NONE
+        question = self.store.id_of(question)
+        return question if question != NONE and self._is_question_id(question) else NONE
+
+    def _is_question_id(self, question: int) -> bool:
+        if self._is_question is None:
+            self._is_question = bytearray(self.store._count())
+            collections.deque(map(self._is_question.__setitem__, self._order, itertools.repeat(1)), maxlen=0)
+        return bool(self._is_question[question])
+
+    def answers(self, question: str) -> list:
+        question = self._id(question)
+        if question == NONE:
+            return []
+        return list(map(self.store._str, self._answer_ids(question)))
+
+    def items_of(self, question: str) -> list:
+        # the keys of the store's items that a question is about
+        if self.ask_for == 'keys':
+            return [question]
+        items = self.answers(question) if self.ask_for == 'values' else self.store.keys_of(question)
+        if self.ask_for == 'both' and question in self.store:
+            items.insert(0, question)
+        return items
+
+    def _with_order(self, order, ask_for: str = None) -> 'ItemView':
+        return ItemView(self.store, ask_for or self.ask_for, order, self._used)
+
+    def reorder(self, questions) -> 'ItemView':
+        # the view restricted to questions, in that order
+        questions = self.store._ids_of(questions)
+        return self._with_order(question for question in questions if question != NONE and self._is_question_id(question))
+
+    def shuffled(self) -> 'ItemView':
+        order = array.array('i', self._order)
+        # random.shuffle changes the array *in-place*
+        random.shuffle(order)
+        return self._with_order(order)
+
+    def sorted(self) -> 'ItemView':
+        return self._with_order(sorted(self._order, key=self.store._str))
+
+    def inverted(self) -> 'ItemView':
+        # asks for the answers of this view's questions, in the same order
+        ask_for = {'keys': 'values', 'values': 'keys', 'both': 'both'}[self.ask_for]
+        if not self.store._next:
+            # the strings are all different: the answer of each question is the other string of its pair
+            return self._with_order(map(operator.xor, self._order, itertools.repeat(1)), ask_for)
+        return self._with_order((answer for question in self._order for answer in self._answer_ids(question)), ask_for)
+
+    def both(self) -> 'ItemView':
+        # asks for this view's questions, and then for their answers
+        return self._with_order([*self._order, *self.inverted()._order], 'both')
+
+    def __getitem__(self, question: str) -> str:
+        question_id = self._id(question)
+        if question_id == NONE:
+            raise KeyError(question)
+        return self._answer(question_id)
+
+    def __contains__(self, question) -> bool:
+        return self._id(question) != NONE
+
+    def __iter__(self):
+        return map(self.store._str, self._order)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    # going through the questions in order is faster than looking each of them up
+    def values(self) -> collections.abc.ValuesView:
+        return _ValuesView(self)
+
+    def items(self) -> collections.abc.ItemsView:
+        return _ItemsView(self)
+
+    def __repr__(self) -> str:
+        return f'ItemView({list(self.items())!r})'
+
+
+class _ValuesView(collections.abc.ValuesView):
+    def __iter__(self):
+        view = self._mapping
+        if not view.store._next:
+            # the strings are all different: the answer of each question is the other string of its pair
+            return map(view.store._str, map(operator.xor, view._order, itertools.repeat(1)))
+        return map(view._answer, view._order)
+
+
+class _ItemsView(collections.abc.ItemsView):
+    def __iter__(self):
+        view = self._mapping
+        return zip(map(view.store._str, view._order), iter(view.values()))
+
+
+def select(data, questions) -> collections.abc.Mapping:
+    # data restricted to questions, in that order. ItemViews stay views of their store.
+    if isinstance(data, ItemView):
+        return data.reorder(questions)
+    return collections.OrderedDict((question, data[question]) for question in questions)
@@ -0,0 +1,85 @@
+import json
+import os
+
+from src import helpers
+
+
+def journal_path(learndata_file: str) -> str:
+    return helpers.sidecar_path(learndata_file, 'journal')
+
+
+class Journal:
+    """
+    Progress of the current session, kept in a hidden file next to the learndata file, so that the session
+    can be resumed with --resume if it's interrupted. The file has one JSON value per line:
+    the session's settings when it starts, and then a [pass, question, found] line after each answer
+    (pass is 1 for the values asked about in the second half of --ask-for both).
+    Lines are only appended, and the file is removed once the session is over.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        # size of the journal's complete lines, when it was loaded
+        self._intact_size = None
+
+    def load(self) -> tuple or None:
+        """
+        Read the journal of an interrupted session.
+        Returns its settings (a dict) and its answers (a list of (pass, question, found)), or None if there's none.
+        A line that was cut by an interruption ends the journal.
+        """
+        answers = list()
+        try:
+            with open(self.path, 'rb') as f:
+                settings = json.loads(f.readline() or b'null')
+                size = f.tell()
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    answers.append(tuple(json.loads(line)))
+                    size += len(line)
+        except (FileNotFoundError, ValueError):
+            return None
+        if not isinstance(settings, dict):
+            return None
+        self._intact_size = size
+        return settings, answers
+
+    def start(self, settings: dict = None) -> None:
+        # start a new journal with these settings, or continue the loaded one if settings is None
+        if settings is None:
+            # without the line that was cut, if any
+            os.truncate(self.path, self._intact_size)
+            self._file = open(self.path, 'a', encoding='utf8', newline='\n')
+        else:
+            self._file = open(self.path, 'w', encoding='utf8', newline='\n')
+            self._write(settings)
+
+    @property
+    def started(self) -> bool:
+        return self._file is not None
+
+    def _write(self, value) -> None:
+        # flushed right away, so that an interruption can only cut the last line
+        self._file.write(json.dumps(value, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def log(self, session_pass: int, question: str, found: bool) -> None:
+        if self.started:
+            self._write([session_pass, question, found])
+
+    def close(self) -> None:
+        if self.started:
+            self._file.close()
+            self._file = None
+
+    def finish(self) -> None:
+        # the session is over, there's nothing to resume (nothing was written if the journal couldn't be started)
+        if not self.started:
+            return
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -1,100 +1,138 @@
-import collections
 import logging
-import random
-import shutil
 import sys
-import tkinter as tk
-from tkinter import filedialog
+import time
 
-from src import ask, parser
+from src import ask, binary, blacklist, decks, grading, items, journal, matching, parser, render, reviews, stats
+from src.profiling import tracer
+from src.pool import PendingPool
 from src.consts import *
-from src.helpers import cprint, colored, term_size
+from src.helpers import cprint, colored
 
 
-def train_loop(data: collections.OrderedDict, flags: parser.FlagsParser) -> None:
-    found = list()
-    # if we still have stuff not found
-    while len(found) < len(data.keys()):
-        # randomly pick a question, and get its corresponding answer,
-        # among the questions that weren't found.
-        asked = random.choice([key for key in data.keys() if key not in found])
-        answer = data[asked]
+async def train_loop(data: items.ItemView, flags: parser.FlagsParser, on_answer=None, matchers: dict = None,
+                     answered: dict = None) -> None:
+    # compile the answers once, if that wasn't done already
+    if matchers is None:
+        matchers = matching.compile_answers(data, flags)
+    # questions that weren't found yet (answered: whether questions were found, restored by --resume)
+    pending = PendingPool(data.keys() if not answered else (asked for asked in data.keys() if not answered.get(asked)))
 
+    def question_screen() -> render.Screen:
+        # everything shown before the question is written at once
+        screen = render.Screen()
         # print centered title if screen is cleared each time
         if flags.clear_screen:
-            print('LEARN_IT! by Mx3'.center(term_size().columns))
-            print('-' * term_size().columns)
+            screen.title()
 
         if flags.show_remaining_items_count:
-            cprint(T['remaining_items_count'].format(n=len(data) - len(found), s='s' if len(data) - len(found) != 1 else ''))
-        
-        # if the user replied correctly
-        bFound = ask.get_ans(asked, answer, flags)
+            screen.add(T['remaining_items_count'].format(n=len(pending), s='s' if len(pending) != 1 else ''))
+        return screen
+
+    question_screen().flush()
+    # if we still have stuff not found
+    while pending:
+        # randomly pick a question, and get its corresponding answer,
+        # among the questions that weren't found.
+        asked = pending.pick()
+        answer = data[asked]
 
-        helpers.delete_prev_line()
+        # if the user replied correctly (None if --time-limit ran out)
+        start = time.perf_counter()
+        bFound = await ask.get_ans(asked, answer, flags, matchers[asked])
+        # let the caller know about the answer and how long it took (used to keep track of reviews and stats)
+        if on_answer:
+            on_answer(asked, bool(bFound), time.perf_counter() - start)
+
+        screen = render.Screen().delete_prev_line()
 
         if bFound:
-            # add the question to found
-            found.append(asked)
-            cprint(T['correct'], "green")
+            # remove the question from the pending ones
+            pending.remove(asked)
+            screen.add(T['correct'], "green")
         else:
-            cprint(T['correct_answer'].format(answer), 'red')
+            if bFound is None:
+                screen.add(T['time_is_up'], 'red')
+            screen.add(T['correct_answer'].format(answer), 'red')
+        screen.flush()
 
-        # mark the end of this question (depends on --clear-screen)
-        ask.question_end(flags, found=bFound, asked=asked)
+        # mark the end of this question (depends on --clear-screen).
+        # The next question's screen is ready before that, so it's shown right after
+        await ask.question_end(flags, found=bFound, asked=asked, next_screen=question_screen() if pending else None)
 
 
-def testing_loop(data: collections.OrderedDict, flags: parser.FlagsParser) -> tuple:
+async def testing_loop(data: items.ItemView, flags: parser.FlagsParser, on_answer=None, matchers: dict = None,
+                       answered: dict = None) -> tuple:
+    # compile the answers once, if that wasn't done already
+    if matchers is None:
+        matchers = matching.compile_answers(data, flags)
     # init lists & idx
     found = list()
     notfound = list()
-    loop_idx = 0
-    # for each learndata item
-    for asked, answer in data.items():
+    # answers restored by --resume
+    answered = answered or dict()
+    for asked, was_found in answered.items():
+        if asked in data:
+            (found if was_found else notfound).append(asked)
+
+    def question_screen() -> render.Screen:
+        # everything shown before the question is written at once
+        screen = render.Screen()
         # print centered title if screen is cleared each time
         if flags.clear_screen:
-            print('LEARN_IT! by Mx3'.center(term_size().columns))
-            print('-' * term_size().columns)
+            screen.title()
 
         # if --always-show-grade allows it, calculate and print the grade after each answer
         if flags.always_show_grade:
-            show_grade(found, data, flags)
+            show_grade(found, data, flags, screen=screen)
 
         if flags.show_remaining_items_count:
-            cprint(T['remaining_items_count'].format(n=len(data) - len(found), s='s' if len(data) - len(found) != 1 else ''))
+            screen.add(T['remaining_items_count'].format(n=len(data) - len(found), s='s' if len(data) - len(found) != 1 else ''))
+        return screen
 
-        # if we found the correct answer
-        bFound = ask.get_ans(asked, answer, flags)
-
-        helpers.delete_prev_line()
+    question_screen().flush()
+    # for each learndata item
+    for loop_idx, (asked, answer) in enumerate(data.items()):
+        if asked in answered:
+            continue
+        # if we found the correct answer (None if --time-limit ran out)
+        start = time.perf_counter()
+        bFound = await ask.get_ans(asked, answer, flags, matchers[asked])
+        # let the caller know about the answer and how long it took (used to keep track of reviews and stats)
+        if on_answer:
+            on_answer(asked, bool(bFound), time.perf_counter() - start)
+
+        screen = render.Screen().delete_prev_line()
 
         if bFound:
             # displays the message
-            cprint(T['correct'], "green")
+            screen.add(T['correct'], "green")
             # adds the question to found list
             found.append(asked)
         # if we failed
         else:
+            if bFound is None:
+                screen.add(T['time_is_up'], 'red')
             # show the answer if --show-answer-in-testing-mode allows it
             if flags.show_answer_in_testing_mode:
-                cprint(T['correct_answer'].format(answer), 'red')
+                screen.add(T['correct_answer'].format(answer), 'red')
             # or just simply print "Wrong"
             else:
-                cprint(T['wrong'], 'red')
+                screen.add(T['wrong'], 'red')
             # adds the question to notfound list
             notfound.append(asked)
+        screen.flush()
 
-        # mark the end of this question (depends on --clear-screen)
-        ask.question_end(flags, found=bFound, asked=asked)
-
-        loop_idx += 1
+        # mark the end of this question (depends on --clear-screen).
+        # The next question's screen is ready before that, so it's shown right after
+        last = loop_idx == len(data) - 1
+        await ask.question_end(flags, found=bFound, asked=asked, next_screen=None if last else question_screen())
     return found, notfound
 
 
-def show_grade(found, data: collections.OrderedDict, flags: parser.FlagsParser) -> float:
+def show_grade(found, data: items.ItemView, flags: parser.FlagsParser, screen: render.Screen = None) -> float:
     # get grade: the number of questions found (correctly answered) divided by the total number of questions
     # rounded to --grade-precision digits and converted to fit --grade-max
-    grade = round(len(found) / len(data) * flags.grade_max, flags.grade_precision)
+    grade = grading.compute_grade(len(found), len(data), flags)
     # get color based on the threshold (--grade-max * --good-grade)
     # if the calculated grade is higher or equal to that threshold, set the text to green
     # else set it to red
@@ -102,43 +140,39 @@ def show_grade(found, data: collections.OrderedDict, flags: parser.FlagsParser)
     # show % instead of "/100"
     disp_grademax = '/'+str(flags.grade_max) if flags.grade_max != 100 else '%'
     # show values, with converted grade, and original grade (correctly answered / total number of learndata items)
-    cprint('Your grade: {}{} ({}/{})'.format(grade, disp_grademax, len(found), len(data)), color)
+    text = 'Your grade: {}{} ({}/{})'.format(grade, disp_grademax, len(found), len(data))
+    # add it to the screen if we're building one, print it otherwise
+    if screen:
+        screen.add(text, color)
+    else:
+        cprint(text, color)
     # returns the grade in case we want to use the value for further processing
     # todo if we ever need this, we should add a "no_print" argument to the function
     return grade
 
 
-def recap(data: collections.OrderedDict) -> None:
-    cprint("You need to learn about:", 'red')
-    # prints nicely the items provided
-    lines = helpers.pprint_dict(data, return_str=True).split('\n')
-    lines = [e.strip() for e in lines]
-    # function to determinate if the terminal is big enough to show N lines
-    has_enough_space_for = lambda n:shutil.get_terminal_size().columns >= maxlinelen * n
-    # get maximum length of one line
-    maxlinelen = max([len(e) for e in lines]) + 2  # padding
-    # determine number of columns based on number of lines
-    if len(lines) >= 16:
-        cols = 4
-    elif len(lines) >= 8:
-        cols = 2
+def recap(data: items.ItemView, export: str = None) -> None:
+    title = "You need to learn about:"
+    size = helpers.term_size()
+    rows = render.recap_rows(data, size.columns)
+    # +2 for the title and the shell's prompt
+    if len(rows) + 2 > size.lines:
+        if export:
+            # a single column, without colors
+            with open(export, 'w', encoding='utf8') as f:
+                f.write('\n'.join([title, *(row.rstrip() for row in render.recap_rows(data))]) + '\n')
+            cprint(T['recap_written'].format(n=len(data), file=helpers.path_contract_user(export)), 'red')
+            return
+        paging = sys.stdout.isatty()
     else:
-        cols = 1
-
-    while not has_enough_space_for(cols):
-        cols -= 1
-    if cols < 1: cols = 1
-
-    columns = list()
-    col_idx = -1
-    for i, line in enumerate(lines):
-        if i % cols == 0:
-            columns.append([line])
-            col_idx += 1
-        else:
-            columns[col_idx].append(line)
+        paging = False
 
-    helpers.colprint(columns, pad=2)
+    # rows alternate between two colors, whose escape codes are only computed once
+    even, odd = helpers.colored('{}', 'white'), helpers.colored('{}', 'cyan')
+    screen = render.Screen().add(title, 'red')
+    screen.add('\n'.join([(odd if i % 2 else even).format(row) for i, row in enumerate(rows)]))
+    if not (paging and render.page(screen.render())):
+        screen.flush()
 
 
 def header(flags: parser.FlagsParser, custom_text: str = None):
@@ -163,31 +197,121 @@ def get_logging_props(level: str) -> tuple:
 
 
 def auto_blacklist(to_blacklist: list, flags: parser.FlagsParser, learndata_file: str):
-    with open(learndata_file, 'r', encoding='utf8') as f:
-        lines = f.read().split('\n')
-    newlines = list()
-    # removes blacklist declaration if found
-    for line in lines:
-        if SYNTAX['flags'].match(line):
-            flag = SYNTAX['flags'].search(line).group(1)
-            if flag == 'blacklist':
-                continue
-        newlines.append(line)
-
-    # adds items to the blacklist
-    blacklist = flags.blacklist + to_blacklist
-    # removes duplicates in list
-    blacklist = list(set(blacklist))
-    # todo implement this better, if SYNTAX['list'] changes, this doesn't.
-    declaration_line = '--blacklist ' + '[' + ', '.join(blacklist) + ']'
-    logging.info(T["adding_line_to_file"].format(line=declaration_line, file=learndata_file))
-    # prepends the blacklist declaration to the lines
-    newlines = [declaration_line] + newlines
-    with open(learndata_file, 'w', encoding='utf8') as f:
-        f.write('\n'.join(newlines))
+    # items are appended to the learndata file's blacklist file, which is merged
+    # into --blacklist when the learndata file is parsed
+    path = blacklist.blacklist_path(learndata_file)
+    added = blacklist.add_to_blacklist(path, to_blacklist, known=flags.blacklist)
+    if added:
+        logging.info(T["adding_to_blacklist"].format(count=len(added), file=path))
+
+
+def stats_unavailable(learndata_file: str, error: OSError):
+    # eg. in a read-only directory, or when a file has the stats directory's name: the session goes on without stats
+    logging.warning(T['stats_unavailable'].format(file=helpers.path_contract_user(stats.stats_path(learndata_file)),
+                                                  error=error.strerror or error))
+
+
+def grade_answer_sheets(args, data: items.ItemView, flags: parser.FlagsParser) -> int:
+    # headless mode: grade the answer sheets of args.answers, and write the results to args.output
+    # with --ask-for both, the sheets can answer in both directions
+    questions = data.both() if flags.ask_for == 'both' else data
+    # nothing to grade (and no grade to compute) without questions
+    if len(questions) < 1:
+        cprint(T['0_items_loaded'], 'red')
+        return 1
+
+    # a directory of answer sheets files is graded in parallel, and gets a per-item report
+    bulk = os.path.isdir(args.answers)
+    if bulk:
+        results = grading.grade_directory(args.answers, questions, flags, getattr(args, 'workers', None))
+        report = grading.items_report(results, questions)
+        write = lambda stream, output_format: grading.write_report(results, report, stream, output_format)
+    else:
+        if args.answers == '-':
+            sheets = grading.read_answer_sheets(sys.stdin)
+        else:
+            with open(args.answers, 'r', encoding='utf8') as f:
+                sheets = grading.read_answer_sheets(f)
+        results = grading.grade_sheets(sheets, questions, flags)
+        write = lambda stream, output_format: grading.write_results(results, stream, output_format)
+
+    output_format = args.format or ('csv' if args.output.endswith('.csv') else 'json')
+    if args.output == '-':
+        write(sys.stdout, output_format)
+    else:
+        with open(args.output, 'w', encoding='utf8', newline='') as f:
+            write(f, output_format)
+    return 0
+
+
+def convert(args) -> int:
+    # run.py export: learndata file -> binary deck, run.py import: binary deck -> learndata file
+    source = helpers.get_absolute_path(args.source)
+    exporting = args.command == 'export'
+    destination = args.destination or os.path.splitext(source)[0] + (binary.EXTENSION if exporting else '.txt')
+    destination = helpers.get_absolute_path(destination)
+    if not os.path.isfile(source):
+        cprint(T['file_not_found'].format(file=helpers.path_contract_user(source)), 'red')
+        return 1
+    if os.path.exists(destination) and not args.force:
+        cprint(T['file_exists'].format(file=helpers.path_contract_user(destination)), 'red')
+        return 1
+
+    if exporting:
+        # the file's own flags are exported, not the ones of its .blacklist file
+        data, flags = parser.read_file(source)
+        binary.write(destination, data, flags)
+    else:
+        try:
+            data, flags = binary.load(source)
+        except ValueError as e:
+            cprint(str(e), 'red')
+            return 1
+        with open(destination, 'w', encoding='utf8', newline='\n') as f:
+            f.writelines(parser.dump(data, flags))
+
+    cprint(T['deck_exported' if exporting else 'deck_imported'].format(count=len(data), file=helpers.path_contract_user(destination)), 'green')
+    return 0
+
+
+def serve(args) -> int:
+    # run.py serve: quiz server for many learners at once
+    logging_level, logging_format = get_logging_props(LOG_LEVEL)
+    logging.basicConfig(level=logging_level, format=logging_format)
+    # asyncio is slow to import, only do it when the server is started
+    import asyncio
+    from src import server
+
+    files = server.find_deck_files(args.paths)
+    if not files:
+        cprint(T['no_decks_found'], 'red')
+        return 1
+    quiz = server.QuizServer(server.load_decks(files), args.session_timeout)
+
+    async def run():
+        listening = await quiz.start(args.host, args.port)
+        host, port = listening.sockets[0].getsockname()[:2]
+        cprint(T['serving_decks'].format(count=len(quiz.decks), s='s' if len(quiz.decks) != 1 else '',
+                                         url=f'http://{host}:{port}/'), 'green')
+        async with listening:
+            await listening.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        cprint("\n" + T['process_closed_by_user'], 'red')
+    return 0
 
 
 def main(flags) -> int:
+    # command-line arguments (flags gets replaced by the learndata's flags later on)
+    args = flags
+    # --profile: record how long things take
+    profile = getattr(args, 'profile', None)
+    if profile:
+        tracer.enable()
+    # progress of the session, for --resume
+    session_journal = None
     try:
         # ---logging config---
         # we need to get level and debug flags before anything else because
@@ -213,6 +337,8 @@ def main(flags) -> int:
         # is going to be the learndata file's path.
 
         fallback = False
+        # learndata files to load together, if a directory or a glob pattern was specified
+        deck_files = list()
         # check if any filepath was specified...
         if ALWAYS_USE_DATA_FILE:
             learndata_file = DATA_FILE
@@ -220,8 +346,15 @@ def main(flags) -> int:
         # via command-line argument
         elif flags.file is not None:
             data_file_maybe = helpers.get_absolute_path(flags.file)
+            # a directory or a glob pattern, either as is or in LEARNDATA_ROOT
+            learndata_file, deck_files = decks.find_decks(data_file_maybe)
+            if not deck_files:
+                learndata_file, deck_files = decks.find_decks(os.path.join(LEARNDATA_ROOT, flags.file))
+            if deck_files:
+                # they're parsed later on, all at once
+                pass
             # check file existence
-            if os.path.isfile(data_file_maybe):
+            elif os.path.isfile(data_file_maybe):
                 # set it as the learndata_file
                 learndata_file = data_file_maybe
             else:
@@ -241,6 +374,9 @@ def main(flags) -> int:
                         fallback = True
         # or via GUI
         else:
+            # tkinter is slow to import, only do it when we actually need the file dialog
+            import tkinter as tk
+            from tkinter import filedialog
             root = tk.Tk()
             root.withdraw()
             data_file_maybe = filedialog.askopenfilename()
@@ -259,16 +395,43 @@ def main(flags) -> int:
                 fallback=helpers.path_contract_user(DATA_FILE)))
             learndata_file = DATA_FILE
 
-        # parse the flags and data from the text file
-        data, flags = parser.parse_file(learndata_file)
-        # convert the flags into a parser.FlagsParser object, and clean up flags by:
-        # - adding non-declared flags with their default values
-        # - removing unknown flags
-        flags = parser.FlagsParser(flags)
-        # keep the original data's length (used for --show-items-count)
-        full_data_count = len(data)
-        # transform learndata according to the flags
-        data = parser.transform_learndata(data, flags)
+        # the learndata file each question comes from and its keys, when loading multiple files
+        sources = None
+        if deck_files:
+            # parse all the files, and merge them into a single session
+            data, flags, sources, full_data_count = decks.merge_decks(deck_files, decks.load_decks(deck_files))
+        else:
+            # parse the flags and data from the text file
+            data, flags = parser.parse_file(learndata_file)
+            # convert the flags into a parser.FlagsParser object, and clean up flags by:
+            # - adding non-declared flags with their default values
+            # - removing unknown flags
+            flags = parser.FlagsParser(flags)
+            # keep the original data's length (used for --show-items-count)
+            full_data_count = len(data)
+            # transform learndata according to the flags
+            data = parser.transform_learndata(data, flags)
+
+        # --answers: grade answer sheets instead of asking questions
+        if getattr(args, 'answers', None):
+            return grade_answer_sheets(args, data, flags)
+
+        # --ask-order due: only ask about items that are due for a review
+        review_store = None
+        if flags.ask_order == 'due':
+            review_store = reviews.ReviewStore(reviews.store_path(learndata_file))
+            data = reviews.due_learndata(data, review_store)
+
+        # log every answer, and use the logs for --ask-order hardest
+        stats_store = None
+        if flags.record_stats or flags.ask_order == 'hardest':
+            try:
+                stats_store = stats.StatsStore(stats.stats_path(learndata_file))
+                if flags.ask_order == 'hardest':
+                    data = stats.hardest_first(data, stats_store)
+            except OSError as e:
+                stats_unavailable(learndata_file, e)
+                stats_store = None
 
         # debug
         if flags.debug:
@@ -283,7 +446,7 @@ def main(flags) -> int:
 
         # exit if loaded items count < 1
         if len(data) < 1:
-            cprint(T['0_items_loaded'], 'red')
+            cprint(T['no_items_due'] if review_store else T['0_items_loaded'], 'red')
             sys.exit(0)
 
         # print loaded items count
@@ -292,55 +455,146 @@ def main(flags) -> int:
             cprint(T['loaded_items'].format(count=len(data), o_count=full_data_count, s='s' if len(data) != 1 else '',
                                             file=display_path), 'green')
 
+        # --resume: continue the last session if it was interrupted
+        session_journal = journal.Journal(journal.journal_path(learndata_file))
+        resumed = session_journal.load() if getattr(args, 'resume', False) else None
+        if resumed and resumed[0].get('ask_for') != flags.ask_for:
+            logging.warning(T['cannot_resume'])
+            resumed = None
+        elif getattr(args, 'resume', False) and not resumed:
+            logging.warning(T['nothing_to_resume'])
+
         # choose testing or training mode
-        if not AUTO_ANSWER:
-            testing_mode = ask.selection(T['choose_mode'], (T['testing'], T['training'])) == T['testing']
+        if resumed:
+            settings, resumed_answers = resumed
+            testing_mode = settings['testing']
+            # ask the questions in the same order (only saved if it was random)
+            if settings.get('questions') is not None:
+                questions = [e for e in settings['questions'] if e in data]
+                # items that were added to the file since then are asked last
+                known = set(questions)
+                data = items.select(data, questions + [e for e in data.keys() if e not in known])
+            journal_settings = None
         else:
-            testing_mode = True
-
-
-        def main_loop(testing_mode: bool, data, flags) -> list:
+            resumed_answers = list()
+            if not AUTO_ANSWER:
+                testing_mode = ask.selection(T['choose_mode'], (T['testing'], T['training'])) == T['testing']
+            else:
+                testing_mode = True
+            journal_settings = {'testing': testing_mode, 'ask_for': flags.ask_for,
+                                'questions': list(data.keys()) if testing_mode and flags.ask_order == 'random' else None}
+        try:
+            session_journal.start(journal_settings)
+        except OSError as e:
+            # eg. in a read-only directory: the session goes on without a journal
+            logging.warning(T['journal_unavailable'].format(file=helpers.path_contract_user(session_journal.path),
+                                                            error=e.strerror or e))
+
+
+        # whether each item was found the first time it was asked, in each direction (see --ask-for both)
+        review_results = dict()
+
+        def answer_recorder(session_pass: int, items_of=lambda asked: [asked]):
+            answered = set()
+
+            def on_answer(asked, found, latency):
+                nonlocal stats_store
+                # answers restored by --resume have no latency, they were logged before
+                replayed = latency is None
+                if not replayed:
+                    session_journal.log(session_pass, asked, found)
+                first_answer = asked not in answered
+                answered.add(asked)
+                for item in items_of(asked):
+                    if stats_store is not None and flags.record_stats and not replayed:
+                        try:
+                            stats_store.log(item, found, latency)
+                        except OSError as e:
+                            stats_unavailable(learndata_file, e)
+                            stats_store = None
+                    if first_answer:
+                        review_results[item] = review_results.get(item, True) and found
+
+            return on_answer
+
+        def main_loop(testing_mode: bool, data, flags, on_answer=None, answered: dict = None) -> list:
+            # compile the answers before starting, so that checking them is quick
+            matchers = matching.compile_answers(data, flags)
+            # asyncio is slow to import, only do it when a session actually starts
+            import asyncio
             if testing_mode:
-                found, notfound = testing_loop(data, flags)
+                found, notfound = asyncio.run(testing_loop(data, flags, on_answer, matchers, answered))
                 show_grade(found, data, flags)
             else:
                 # in training mode, all items are always found
                 notfound = list()
-                train_loop(data, flags)
+                asyncio.run(train_loop(data, flags, on_answer, matchers, answered))
 
             return notfound
 
         # let's start!
         
         # clear the screen
-        os.system('clear')
+        render.clear()
 
         # if we ask for keys AND values, execute main_loop,
-        # & execute main_loop again with inverted dict mapping, and then show recap
+        # & execute main_loop again with an inverted view of the items, and then show recap
+        inverted_data = data.inverted() if flags.ask_for == 'both' else None
+        recorders = [answer_recorder(0), *([answer_recorder(1, inverted_data.items_of)] if inverted_data else [])]
+        # replay the answers of the interrupted session: whether each question was found (at least once, in training mode)
+        answered = [dict(), dict()]
+        for session_pass, asked, found in resumed_answers:
+            recorders[session_pass](asked, found, None)
+            answered[session_pass][asked] = found or answered[session_pass].get(asked, False)
+
         if flags.ask_for == 'both':
-            v_notfound = main_loop(testing_mode, data, flags)
-            k_notfound = main_loop(testing_mode, helpers.invert_dict_mapping(data), flags)
-            # invert back dict mapping
-            k_notfound = [k for k, v in data.items() if v in k_notfound]
+            v_notfound = main_loop(testing_mode, data, flags, recorders[0], answered[0])
+            k_notfound = main_loop(testing_mode, inverted_data, flags, recorders[1], answered[1])
+            # get the keys the values that weren't found belong to
+            k_notfound = [k for v in k_notfound for k in inverted_data.items_of(v) if k in data]
             if flags.strict_learn_about:
                 notfound = list(set(v_notfound + k_notfound))
             else:
                 notfound = [e for e in k_notfound + v_notfound if e in k_notfound and e in v_notfound]
                 notfound = list(set(notfound))
         else:
-            notfound = main_loop(testing_mode, data, flags)
-
-        notfound_data = {k:v for k, v in data.items() if k in notfound}
-        notfound_data = collections.OrderedDict(**notfound_data)
+            notfound = main_loop(testing_mode, data, flags, recorders[0], answered[0])
+        session_journal.finish()
+
+        if review_store:
+            review_store.record(review_results)
+            review_store.close()
+        if stats_store:
+            try:
+                stats_store.close()
+            except OSError as e:
+                stats_unavailable(learndata_file, e)
+
+        notfound = set(notfound)
+        notfound_data = items.select(data, [e for e in data.keys() if e in notfound])
         found = [e for e in data.keys() if e not in notfound]
 
         if len(notfound):
-            recap(notfound_data)
+            recap(notfound_data, getattr(args, 'recap', None))
 
         if flags.auto_blacklist:
-            auto_blacklist(found, flags, learndata_file)
+            # blacklists are about keys, even when values were asked for
+            if sources:
+                # add items to the blacklist of the file they come from (merged decks keep track of their keys)
+                for deck_file, deck_items in decks.group_by_deck(found, sources).items():
+                    auto_blacklist(deck_items, flags, deck_file)
+            else:
+                auto_blacklist([item for asked in found for item in data.items_of(asked)], flags, learndata_file)
 
 
     except KeyboardInterrupt:
         cprint("\n" + T['process_closed_by_user'], 'red')
+        if session_journal is not None and session_journal.started:
+            session_journal.close()
+            cprint(T['resume_hint'], 'red')
         return 1
+    finally:
+        if profile:
+            tracer.write(profile)
+            logging.info(T['profile_written'].format(file=profile, totals=', '.join(
+                f'{category}: {seconds:.3f}s' for category, seconds in tracer.totals().items())))
@@ -0,0 +1,209 @@
+import unicodedata
+
+# letters that aren't split into a base letter and accents by unicode normalization, but are still folded by --fold-accents
+LIGATURES = str.maketrans({'œ': 'oe', 'æ': 'ae', 'Œ': 'OE', 'Æ': 'AE', 'ß': 'ss'})
+
+
+def normalize(text: str, case_sensitive: bool = False, fold_accents: bool = False) -> str:
+    """
+    Normalize an answer before comparing it:
+    - unicode normalization (NFC), so that "é" typed as one or two code points is the same thing
+    - leading, trailing and repeated whitespace is removed
+    - case folding, unless case_sensitive is set
+    - accents, diacritics and stress marks are removed if fold_accents is set: "é" becomes "e", "ё" becomes "е", "й" becomes "и"...
+    """
+    text = ' '.join(unicodedata.normalize('NFC', text).split())
+    if not case_sensitive:
+        text = text.casefold()
+    if fold_accents:
+        text = ''.join(char for char in unicodedata.normalize('NFD', text) if not unicodedata.combining(char))
+        text = text.translate(LIGATURES)
+    return text
+
+
+def bounded_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Damerau-Levenshtein distance (optimal string alignment: insertions, deletions, substitutions
+    and transpositions of adjacent characters) between a and b, if it is lower than or equal to max_distance.
+    Returns max_distance + 1 otherwise.
+    Only the cells of the distance matrix that are at most max_distance away from its diagonal are computed,
+    and the computation stops as soon as a whole row is above max_distance.
+    """
+    if a == b:
+        return 0
+    too_far = max_distance + 1
+
+    # common prefixes and suffixes don't change the distance
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < len(a) - start and end < len(b) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a = a[start:len(a) - end]
+    b = b[start:len(b) - end]
+
+    if abs(len(a) - len(b)) > max_distance:
+        return too_far
+    if not a or not b:
+        return max(len(a), len(b))
+
+    # rows of the matrix: the one before the previous one (for transpositions), the previous one, and the current one
+    before_prev = None
+    prev = [j if j <= max_distance else too_far for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        cur = [too_far] * (len(b) + 1)
+        cur[0] = i if i <= max_distance else too_far
+        row_min = cur[0]
+        char = a[i - 1]
+        for j in range(max(1, i - max_distance), min(len(b), i + max_distance) + 1):
+            distance = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (char != b[j - 1]))
+            if i > 1 and j > 1 and char == b[j - 2] and a[i - 2] == b[j - 1]:
+                distance = min(distance, before_prev[j - 2] + 1)
+            cur[j] = distance
+            if distance < row_min:
+                row_min = distance
+        if row_min > max_distance:
+            return too_far
+        before_prev, prev = prev, cur
+
+    return min(prev[-1], too_far)
+
+
+ESCAPE = '\\'
+
+
+def split_answer(answer: str, and_syntax: str, or_syntax: str = None) -> list:
+    """
+    Split an answer into groups (separated by and_syntax) of alternatives (separated by or_syntax, if there's one).
+    Operators preceded by a backslash are kept as is, without the backslash.
+    Eg. "Bus || Car && Salut" gives [["Bus ", " Car "], [" Salut"]]
+    """
+    # check the longest operator first, in case one of them starts with the other
+    operators = sorted(((syntax, kind) for syntax, kind in ((and_syntax, 'and'), (or_syntax, 'or')) if syntax),
+                       key=lambda operator: -len(operator[0]))
+    groups = [[]]
+    current = list()
+    i = 0
+    while i < len(answer):
+        for syntax, kind in operators:
+            if answer.startswith(ESCAPE + syntax, i):
+                current.append(syntax)
+                i += len(ESCAPE + syntax)
+                break
+            if answer.startswith(syntax, i):
+                groups[-1].append(''.join(current))
+                current = list()
+                if kind == 'and':
+                    groups.append([])
+                i += len(syntax)
+                break
+        else:
+            current.append(answer[i])
+            i += 1
+    groups[-1].append(''.join(current))
+    return groups
+
+
+class AnswerMatcher:
+    """
+    Compiled correct answer, built once by compile_answer and used to check every answer given for an item.
+    The answer is made of groups that must all be given, in any order, and each group can be
+    given as any of its alternatives. Alternatives are normalized once, and associated with their group,
+    so that checking exact answers is a matter of set lookups.
+    """
+
+    def __init__(self, groups: list, case_sensitive: bool = False, fold_accents: bool = False, typo_tolerance: int = 0,
+                 and_syntax: str = '&&'):
+        self.case_sensitive = case_sensitive
+        self.fold_accents = fold_accents
+        self.typo_tolerance = typo_tolerance
+        self.and_syntax = and_syntax
+        self.groups = list()
+        # normalized alternative: index of its group
+        self.alternatives = dict()
+        for alternatives in groups:
+            alternatives = {self.normalize(alternative) for alternative in alternatives} - {''}
+            if not alternatives:
+                continue
+            for alternative in alternatives:
+                self.alternatives.setdefault(alternative, len(self.groups))
+            self.groups.append(frozenset(alternatives))
+
+    def normalize(self, text: str) -> str:
+        return normalize(text, self.case_sensitive, self.fold_accents)
+
+    def split(self, given: str) -> list:
+        # the parts of a given answer, normalized
+        if len(self.groups) < 2:
+            return [self.normalize(given)]
+        # only --and-syntax separates the parts: the alternatives can contain anything else, eg. commas
+        parts = [part for part, in split_answer(given, self.and_syntax)]
+        return [part for part in map(self.normalize, parts) if part]
+
+    def close_enough(self, part: str, group: frozenset) -> bool:
+        return part in group or (self.typo_tolerance > 0 and any(
+            bounded_distance(part, alternative, self.typo_tolerance) <= self.typo_tolerance for alternative in group
+        ))
+
+    def matches(self, given: str) -> bool:
+        parts = self.split(given)
+        if len(parts) != len(self.groups):
+            # an empty answer for an empty correct answer
+            return not self.groups and parts == ['']
+
+        # exact answers: each part must be an alternative of a different group
+        found_groups = {self.alternatives.get(part) for part in parts}
+        if None not in found_groups and len(found_groups) == len(self.groups):
+            return True
+
+        if not self.typo_tolerance:
+            return False
+        return self._assign(parts, set(range(len(self.groups))))
+
+    def _assign(self, parts: list, remaining_groups: set) -> bool:
+        # try to give each part its own group, allowing typos
+        if not parts:
+            return True
+        part, others = parts[0], parts[1:]
+        for group in list(remaining_groups):
+            if self.close_enough(part, self.groups[group]):
+                remaining_groups.remove(group)
+                if self._assign(others, remaining_groups):
+                    return True
+                remaining_groups.add(group)
+        return False
+
+
+class AnyMatcher:
+    """
+    Several compiled correct answers, any of which is accepted (eg. for a key that has several values).
+    """
+
+    def __init__(self, matchers: list):
+        self.matchers = matchers
+
+    def matches(self, given: str) -> bool:
+        return any(matcher.matches(given) for matcher in self.matchers)
+
+
+def compile_answer(answer: str, flags) -> AnswerMatcher:
+    return AnswerMatcher(split_answer(answer, flags.and_syntax, flags.or_syntax), flags.case_sensitive,
+                         flags.fold_accents, flags.typo_tolerance, flags.and_syntax)
+
+
+def compile_answers(data: dict, flags) -> dict:
+    # {asked: compiled answer}
+    # the questions of an ItemView can have several correct answers, instead of the joined ones data[asked] gives
+    answers_of = getattr(data, 'answers', None)
+    if answers_of is None:
+        return {asked: compile_answer(answer, flags) for asked, answer in data.items()}
+
+    matchers = dict()
+    for asked in data:
+        answers = answers_of(asked)
+        if len(answers) == 1:
+            matchers[asked] = compile_answer(answers[0], flags)
+        else:
+            matchers[asked] = AnyMatcher([compile_answer(answer, flags) for answer in answers])
+    return matchers
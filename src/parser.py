@@ -1,56 +1,90 @@
 import ast
-import collections
 import itertools
 import json
 import logging as log
-import random
 import sys
 
-from src import helpers
+from src import binary, blacklist, cache, filters, helpers, items
+from src.profiling import traced
 from src.consts import *
 
 
 def parse_preset(lines) -> dict:
     preset = None
     for line in lines:
-        if SYNTAX['flags'].match(line):
-            if SYNTAX['flags'].search(line).group(1) == 'preset':
-                preset = SYNTAX['flags'].search(line).group(2)
+        match = SYNTAX['flags'].match(line)
+        if match and match.group(1) == 'preset':
+            preset = match.group(2)
 
-    if not os.path.isfile(PRESETS_FILE):
+    return load_preset(preset)
+
+
+class PresetRegistry:
+    """
+    Presets of the presets file, read and decoded once per process.
+    The file is only read again if it changed since then (according to its modification time and size).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._signature = None
+        self._presets = dict()
+
+    def presets(self) -> dict or None:
+        # returns None if the presets file doesn't exist
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature != self._signature:
+            with open(self.path, 'r', encoding='utf8') as f:
+                presets = json.load(f)
+            # removes leading dashes
+            self._presets = {name: {k.lstrip('-'): v for k, v in flags.items()} for name, flags in presets.items()}
+            self._signature = signature
+        return self._presets
+
+
+preset_registry = PresetRegistry(PRESETS_FILE)
+
+
+def load_preset(preset: str = None) -> dict:
+    presets = preset_registry.presets()
+    if presets is None:
         log.error('Presets file not found, ignoring preset')
         return {}
 
     if preset is None:
         return {}
 
-    # get the presets file contents
-    presets_file_contents = open(PRESETS_FILE, 'r', encoding='utf8').read()
     # get the flags and their values for the chosen preset
     # if the specified preset doesn't exists, throw an error in the log
     try:
-        flags = json.loads(presets_file_contents)[preset]
+        return dict(presets[preset])
     except KeyError:
         log.error(f'Unknown preset "{preset}", ignoring')
         return {}
 
-    # removes leading dashes
-    flags = {k.lstrip('-'): v for k, v in flags.items()}
-    return flags
+
+# every way to write a boolean, see SYNTAX['booleans']
+# (that's why we flatten the nested tuples with itertools.chain's from_iterable)
+BOOLEANS = frozenset(itertools.chain.from_iterable(SYNTAX['booleans']))
 
 
 def parse_flag_type(val):
     # handle booleans, see if the lowercase flag value is in ANY of the booleans syntax
-    # (that's why we flatten the nested tuples with itertools.chain's from_iterable)
-    if val.lower() in list(itertools.chain.from_iterable(SYNTAX['booleans'])):
+    if val.lower() in BOOLEANS:
         # the first child tuple contains trues
         return val.lower() in SYNTAX['booleans'][0]
 
     # handle lists. Those aren't handled by ast.literal_eval because the syntax used doesn't require
     # quotes around values, considering it as a list of string anyway
-    if SYNTAX['lists'].match(val):
+    match = SYNTAX['lists'].match(val)
+    if match:
         # get only values
-        vals = SYNTAX['lists'].search(val).group(1)
+        vals = match.group(1)
         # split by ",", and strip values to remove potential whitespace
         # (eg if the user noted the list with ", " as the separator)
         return [e.strip() for e in vals.split(',')]
@@ -74,9 +108,9 @@ def parse_flags(lines, flags: dict = None) -> tuple:
 
     other_lines = list()
     for line in lines:
-        if SYNTAX['flags'].match(line):
-            flag = SYNTAX['flags'].search(line).group(1)
-            val = SYNTAX['flags'].search(line).group(2)
+        match = SYNTAX['flags'].match(line)
+        if match:
+            flag, val = match.group(1), match.group(2)
 
             # ignore the "preset" flag, it should be handled by parse_preset by now
             if flag == 'preset':
@@ -118,7 +152,7 @@ def parse_data(lines: list):
     # value
     # <empty line>
 
-    data = dict()
+    pairs = list()
     for i, line in enumerate(lines):
         # get the previous/next line, or set it to an empty one
         # if this is the first/last line
@@ -136,119 +170,263 @@ def parse_data(lines: list):
         # key - the current line
         # value - the next line
         if not prevline:
-            data[line] = nextline
+            pairs.append((line, nextline))
         # if we are in the middle of a item (ie on the value line) or on a separator, skip the line
         else:
             continue
-    return data
+    return items.ItemStore(pairs)
+
+
+def iter_parse(lines):
+    """
+    Parses learndata lines in a single pass, reading them one by one.
+    Yields ('preset', name), ('flag', name, value) and ('item', key, value) tuples, in the order they're found.
+    This gives the same results as parse_preset, parse_flags, cleanup and parse_data,
+    but only keeps the previous line and the key waiting for its value in memory.
+    """
+    # empty lines before the first data line are ignored (like cleanup's strip_list does)
+    started = False
+    # number of empty lines seen since the last data line. They are only replayed once
+    # another data line comes, so that empty lines at the end of the file are ignored too
+    blanks = 0
+    # the previous data line (an empty line means that the current line starts a new item)
+    prevline = ''
+    # the key that is waiting for its value (the next data line)
+    key = None
+
+    def feed(line):
+        nonlocal prevline, key
+        # the line right after a key is its value
+        if key is not None:
+            yield 'item', key, line
+            key = None
+        # if the previous line is empty (ie if the previous line is a separator)
+        # the current line is the key of a new item
+        if not prevline:
+            key = line
+        prevline = line
+
+    for line in lines:
+        match = SYNTAX['flags'].match(line)
+        if match:
+            flag, val = match.group(1), match.group(2)
+            if flag == 'preset':
+                yield 'preset', val
+                continue
+            # a flag specified alone is set to true (kinda like bash's flags)
+            val = True if val is None else parse_flag_type(val)
+            if val is not None:
+                yield 'flag', flag, val
+            continue
+
+        line = line.rstrip('\n')
+        if SYNTAX['comments'].match(line):
+            continue
+
+        if not line:
+            if started:
+                blanks += 1
+            continue
+
+        started = True
+        for _ in range(blanks):
+            yield from feed('')
+        blanks = 0
+        yield from feed(line)
+
+    # the last key has no value line
+    if key is not None:
+        yield 'item', key, ''
+
+
+def parse(lines, reader=None) -> tuple:
+    # reader: yields the items and flags of lines, like iter_parse (the default) does for learndata files (see importers.py)
+    flags = dict()
+    preset = None
 
+    def pairs():
+        nonlocal preset
+        for kind, *args in (reader or iter_parse)(lines):
+            if kind == 'item':
+                yield args
+            elif kind == 'flag':
+                flag, val = args
+                flags[flag] = val
+            else:
+                preset, = args
 
-def parse(lines: list) -> tuple:
-    # First get flag values from the preset. If an error occured while getting flag values (or no preset was specified),
-    # an empty dict is returned. The flags dict gets overriden by parse_flags, so this doesn't need further handling.
-    flags = parse_preset(lines)
-    # parse flags first, and get a new "lines" list, without flags declarations in it.
-    # we do this because we don't need to clean anything before, as the flags parser uses
-    # a strict syntax (the line must match the SYNTAX['flags'] regex pattern)
-    # we pass the flags dict because we want to keep flag values set by the preset that aren't overriden.
-    flags, lines = parse_flags(lines, flags)
-    # clean up the lines, removing:
-    # - empty lines at the beginning and the end
-    # - ending "\n" at each line
-    # - comments
-    lines = cleanup(lines)
-    data = parse_data(lines)
+    # items are added to the store as they're parsed
+    data = items.ItemStore(pairs())
+
+    # Flag values from the preset are overriden by the ones declared in the file, wherever --preset is declared.
+    # If an error occured while getting flag values (or no preset was specified), an empty dict is returned.
+    flags = {**load_preset(preset), **flags}
 
     return data, flags
 
 
-def parse_file(filepath: str) -> tuple:
+def read_file(filepath: str) -> tuple:
+    # CSV and TSV files, and Anki exports, are read by importers.py.
+    # It uses the parser's functions, so it's only imported now
+    from src import importers
+    reader = importers.reader_for(filepath)
+
+    # the file is read line by line while parsing, instead of being loaded all at once.
+    # Exports of spreadsheets (like Excel's) start with a byte order mark, that isn't part of the first key
+    with open(filepath, 'r', encoding='utf-8-sig' if reader else 'utf8', newline='' if reader else None) as f:
+        return parse(f, reader)
+
+
+@traced()
+def parse_file(filepath: str, use_cache: bool = True) -> tuple:
     if not os.path.isfile(filepath):
         log.fatal(f'File "{filepath}" does not exist')
         sys.exit()
-    with open(filepath, 'r', encoding='utf8') as f:
-        lines = f.readlines()
-    return parse(lines)
+
+    # binary decks are memory-mapped, they don't need to be parsed nor cached
+    if binary.is_deck(filepath):
+        try:
+            data, flags = binary.load(filepath)
+        except ValueError as e:
+            log.fatal(e)
+            sys.exit()
+        return data, blacklist.merge_blacklist(flags, filepath)
+
+    cached = cache.load(filepath) if use_cache else None
+    if cached is not None:
+        data, flags = cached
+    else:
+        if use_cache:
+            stat = os.stat(filepath)
+            digest = cache.file_hash(filepath)
+
+        data, flags = read_file(filepath)
+
+        if use_cache:
+            cache.store(filepath, data, flags, stat, digest)
+
+    # items blacklisted by --auto-blacklist are kept in a separate file, so they're not cached with the rest
+    return data, blacklist.merge_blacklist(flags, filepath)
+
+
+def dump_flag_value(val) -> str:
+    # the opposite of parse_flag_type
+    if isinstance(val, bool):
+        return SYNTAX['booleans'][0 if val else 1][0]
+    if isinstance(val, list):
+        return '[' + ', '.join(map(str, val)) + ']'
+    # strings that would be read as something else (eg. "12" or "yes") are quoted
+    return str(val) if parse_flag_type(str(val)) == val else repr(val)
+
+
+def dump(data: items.ItemStore, flags: dict):
+    """
+    The lines of a learndata file that holds data and flags: the opposite of parse.
+    Every (key, value) pair is written as an item, so keys with several values are written several times.
+    """
+    for flag, val in flags.items():
+        yield f'--{flag} {dump_flag_value(val)}\n'
+    if flags:
+        yield '\n'
+    for i, (key, value) in enumerate(data.pairs()):
+        if i:
+            yield '\n'
+        yield key + '\n'
+        yield value + '\n'
+
+
+# FlagsParser's validation table: (flag name, attribute name, default value, legal values or type) for each flag
+FLAGS_TABLE = tuple((flag, flag.replace('-', '_'), default, FLAGS_TYPES[flag]) for flag, default in FLAGS_DEFAULTS.items())
 
 
 class FlagsParser:
+    @traced('FlagsParser')
     def __init__(self, flags: dict):
         self.ask_order = None
-        real_flags = dict()
-        for flag, default in FLAGS_DEFAULTS.items():
+        for flag, attribute, default, legal_vals_type in FLAGS_TABLE:
             # set the value to the corresponding one in the dict, or get its default value
             # from FLAGS_DEFAULTS if not set
-            val = flags.get(flag, default)
+            if flag not in flags:
+                setattr(self, attribute, default)
+                continue
+            val = flags[flag]
 
             # If the flag's value type does not match the one described in FLAGS_TYPES,
             # (eg. we passed a list to the --case-sensitive flag),
             # ignore the flag's value and fallback to the default one
             # FLAGS_TYPES can also contain a tuple of acceptable values. If this is the case,
             # check if the flag's value is in the available values
-            legal_vals_type = FLAGS_TYPES[flag]
-            # if the type is a tuple, the flags accepts discrete values instead of a specific type of values.
             if type(legal_vals_type) == tuple:
                 flag_value_is_legal = val in legal_vals_type
             else:
                 flag_value_is_legal = type(val) == legal_vals_type
 
             if flag_value_is_legal:
-                real_flags[flag] = val
+                setattr(self, attribute, val)
             else:
-                real_flags[flag] = default
-                # log.warning(f'Illegal value "{val}" for flag --{flag}, ignoring.\nAccept values are:{
-                # legal_vals_type}')
+                setattr(self, attribute, default)
                 log.warning(T['illegal_flag_value'].format(val=val, flag=flag, legal_vals_type=legal_vals_type))
 
-        # Get the name of flags that were parsed but that aren't in FLAGS_DEFAULTS (aka unknown flags)
-        for flag in [k for k, v in {k: v for k, v in flags.items() if k not in FLAGS_DEFAULTS.keys()}.items()]:
-            # Print a warning message if warn-unknown-flags is on.
-            if real_flags['warn-unknown-flags']: log.warning(T['unknown_flag'].format(flag))
-
-        # set attribues programmatically, changing dashes to undescores
-        # for the attributes names
-        for flag, val in real_flags.items():
-            setattr(self, flag.replace('-', '_'), val)
+        # Print a warning message for flags that were parsed but that aren't in FLAGS_DEFAULTS (aka unknown flags)
+        # if warn-unknown-flags is on.
+        if self.warn_unknown_flags:
+            for flag in flags:
+                if flag not in FLAGS_DEFAULTS:
+                    log.warning(T['unknown_flag'].format(flag))
 
     def __dict__(self) -> dict:
-        ret = {}
-        for flag in FLAGS_DEFAULTS.keys():
-            ret[flag] = getattr(self, flag.replace('-', '_'))
-        return ret
+        return {flag: getattr(self, attribute) for flag, attribute, _, _ in FLAGS_TABLE}
 
     def __str__(self):
         return helpers.pprint_dict(self.__dict__(), sep='', column_names=('FLAG NAMES', 'VALUES'), return_str=True)
 
+    # __dict__ is overriden, so pickle (used to send flags to other processes) needs to be told what to save
+    def __getstate__(self) -> dict:
+        return self.__dict__()
+
+    def __setstate__(self, state: dict):
+        for flag, val in state.items():
+            setattr(self, flag.replace('-', '_'), val)
+
+
+@traced()
+def filter_learndata(data: items.ItemStore, flags: FlagsParser) -> items.ItemView:
+    # items are filtered by their keys, without copying them
+    keep = None
+    # whitelisted items are looked up, instead of checking every key
+    keys = None
 
-def transform_learndata(data: collections.OrderedDict, flags: FlagsParser) -> collections.OrderedDict:
     # --whitelist
-    if len(flags.whitelist):
-        data = {k: v for k, v in data.items() if k in flags.whitelist}
+    whitelist = filters.ItemFilter(flags.whitelist)
+    if whitelist.patterns:
+        keep = lambda key: key in whitelist
+    elif whitelist:
+        keys = whitelist.items
 
     # --blacklist
     if len(flags.blacklist):
         # if a whitelist is also specified
-        if len(flags.whitelist):
+        if whitelist:
             log.warning(T['no_whitelist_and_blacklist'])
         else:
-            data = {k: v for k, v in data.items() if k not in flags.blacklist}
+            blacklisted = filters.ItemFilter(flags.blacklist)
+            keep = lambda key: key not in blacklisted
 
-    # --ask-for
-    if flags.ask_for == 'values':
-        data = helpers.invert_dict_mapping(data)
+    # --ask-for (with "both", values are asked for with an inverted view, once keys are done)
+    return data.view('values' if flags.ask_for == 'values' else 'keys', keep, keys)
 
+
+@traced()
+def order_learndata(data: items.ItemView, flags: FlagsParser) -> items.ItemView:
     # --ask-order
     if flags.ask_order == 'random':
-        shuffled = list(data.items())
-        # random.shuffle changes the list *in-place*
-        random.shuffle(shuffled)
-        data = collections.OrderedDict()
-        for k, v in shuffled:
-            data[k] = v
+        data = data.shuffled()
     elif flags.ask_order == 'alphabetical':
-        data = collections.OrderedDict(sorted(data.keys()))
-
-    else:
-        data = collections.OrderedDict(**data)
+        data = data.sorted()
 
     return data
+
+
+@traced()
+def transform_learndata(data: items.ItemStore, flags: FlagsParser) -> items.ItemView:
+    return order_learndata(filter_learndata(data, flags), flags)
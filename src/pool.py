@@ -0,0 +1,36 @@
+import random
+
+
+class PendingPool:
+    """
+    Items that still need to be asked, with O(1) random picks and removals.
+
+    Items live in an array, and their position in it is tracked by an index map.
+    Removing an item moves the last one of the array to its place, so nothing has to be shifted.
+    """
+
+    def __init__(self, items=()):
+        # dict.fromkeys removes duplicates while keeping the original order
+        self._items = list(dict.fromkeys(items))
+        self._index = {item: i for i, item in enumerate(self._items)}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item) -> bool:
+        return item in self._index
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def pick(self):
+        # every pending item has the same chance of being picked
+        return random.choice(self._items)
+
+    def remove(self, item) -> None:
+        i = self._index.pop(item)
+        last = self._items.pop()
+        # if the removed item wasn't the last one, put the last one in its place
+        if i < len(self._items):
+            self._items[i] = last
+            self._index[last] = i
@@ -0,0 +1,89 @@
+import collections
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+# categories of spans: time spent by the program, time spent waiting for the user,
+# and delays that are on purpose (eg. giving the user time to read the correct answer)
+PROGRAM = 'program'
+USER = 'user'
+DELAY = 'delay'
+
+
+class Tracer:
+    """
+    Records how long things take, as Chrome trace events (see chrome://tracing or https://ui.perfetto.dev).
+    Nothing is recorded until enable() is called, so that spans cost next to nothing otherwise.
+    """
+
+    def __init__(self):
+        self.events = None
+        self._origin = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.events is not None
+
+    def enable(self) -> None:
+        self.events = list()
+        self._origin = time.perf_counter()
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: str = PROGRAM, **args):
+        if self.events is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.events.append({
+                'name': name,
+                'cat' : category,
+                'ph'  : 'X',
+                # chrome traces use microseconds
+                'ts'  : (start - self._origin) * 1e6,
+                'dur' : (end - start) * 1e6,
+                'pid' : os.getpid(),
+                'tid' : threading.get_ident(),
+                'args': args,
+            })
+
+    def totals(self) -> dict:
+        # total time spent in each category, in seconds. Only top-level spans are counted,
+        # so that nested spans (eg. parse_file inside load_decks) aren't counted twice
+        totals = collections.Counter()
+        end_of_last = -1
+        for event in sorted(self.events or [], key=lambda event: event['ts']):
+            if event['ts'] >= end_of_last:
+                totals[event['cat']] += event['dur'] / 1e6
+                end_of_last = event['ts'] + event['dur']
+        return dict(totals)
+
+    def write(self, path: str) -> None:
+        with open(path, 'w', encoding='utf8') as f:
+            json.dump({'traceEvents': self.events or [], 'displayTimeUnit': 'ms', 'otherData': self.totals()}, f)
+
+
+tracer = Tracer()
+
+
+def traced(name: str = None, category: str = PROGRAM):
+    # decorator that records each call of the function as a span
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer.span(span_name, category):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,94 @@
+import os
+import shutil
+import sys
+
+from src import helpers
+from src.profiling import traced
+
+# move the cursor to the top left corner, clear the screen and the scrollback
+CLEAR = '\033[H\033[2J\033[3J'
+# move the cursor to the previous line and clear it
+DELETE_PREV_LINE = '\033[F\033[K'
+
+
+class Screen:
+    """
+    Terminal output that is built in a buffer, and written all at once by flush().
+    """
+
+    def __init__(self):
+        self._buffer = list()
+
+    def add(self, text: str = '', color: str = None, end: str = '\n') -> 'Screen':
+        self._buffer.append((helpers.colored(text, color) if color else text) + end)
+        return self
+
+    def title(self) -> 'Screen':
+        # centered title, used when the screen is cleared after each question
+        columns = helpers.term_size().columns
+        self.add('LEARN_IT! by Mx3'.center(columns))
+        return self.add('-' * columns)
+
+    def clear(self) -> 'Screen':
+        self._buffer.append(CLEAR)
+        return self
+
+    def delete_prev_line(self) -> 'Screen':
+        self._buffer.append(DELETE_PREV_LINE)
+        return self
+
+    def render(self) -> str:
+        return ''.join(self._buffer)
+
+    @traced('render')
+    def flush(self) -> None:
+        # on windows, colorama needs to wrap stdout so that ANSI sequences work
+        if os.name == 'nt':
+            helpers.init_colors()
+        sys.stdout.write(self.render())
+        sys.stdout.flush()
+        self._buffer.clear()
+
+
+def clear() -> None:
+    # clear the screen without running the `clear` command
+    Screen().clear().flush()
+
+
+def recap_rows(data, width: int = None, pad: int = 2) -> list:
+    """
+    Lays out the items as "key : value" entries, in up to 4 columns that fit in width characters
+    (a single column if width is None). Returns the rows, as lines of text.
+    """
+    keys, values = list(data.keys()), list(data.values())
+    if not keys:
+        return list()
+    key_width = max(map(len, keys)) + 1
+    entries = [f'{key.ljust(key_width)}: {value}' for key, value in zip(keys, values)]
+    col_width = key_width + 2 + max(map(len, values)) + pad
+
+    cols = 1
+    if width is not None:
+        cols = 4 if len(entries) >= 16 else 2 if len(entries) >= 8 else 1
+        while cols > 1 and width < col_width * cols:
+            cols -= 1
+    entries = [entry.ljust(col_width) for entry in entries]
+    return [''.join(entries[i:i + cols]) for i in range(0, len(entries), cols)]
+
+
+def page(text: str) -> bool:
+    """
+    Shows text through the user's pager ($PAGER, or less). Returns False if there is none.
+    """
+    command = os.environ.get('PAGER') or ('less -R' if shutil.which('less') else None)
+    if not command:
+        return False
+    # only needed for huge recaps
+    import shlex
+    import subprocess
+    try:
+        with subprocess.Popen(shlex.split(command), stdin=subprocess.PIPE) as pager:
+            pager.communicate(text.encode(sys.stdout.encoding or 'utf8', errors='replace'))
+    except OSError:
+        return False
+    return True
@@ -0,0 +1,95 @@
+import hashlib
+import sqlite3
+import time
+
+from src import helpers, items
+
+# ease given to items that were never reviewed, and the lowest ease an item can get (see SuperMemo's SM-2 algorithm)
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+DAY = 24 * 60 * 60
+
+
+def store_path(learndata_file: str) -> str:
+    return helpers.sidecar_path(learndata_file, 'reviews')
+
+
+def schedule(ease: float, interval: float, reps: int, correct: bool) -> tuple:
+    """
+    Compute the next (ease, interval, reps) of an item after it was answered, with intervals in days.
+    Items answered correctly are asked again 1 day later, then 6 days later, and then after intervals that grow with their ease.
+    Failed items go back to the start and will be asked in the next session.
+    """
+    if not correct:
+        return max(MIN_EASE, ease - 0.2), 0, 0
+
+    reps += 1
+    if reps == 1:
+        interval = 1
+    elif reps == 2:
+        interval = 6
+    else:
+        interval *= ease
+    return ease + 0.1, interval, reps
+
+
+class ReviewStore:
+    """
+    Review state of a learndata file's items, stored in an SQLite database next to it.
+    Items are indexed by due date, so that getting the ones to review doesn't go through the whole deck.
+    The digest of the last items that were added is kept too, so that an unchanged deck isn't inserted again at every start.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        with self.db:
+            self.db.execute('CREATE TABLE IF NOT EXISTS reviews ('
+                            'item TEXT PRIMARY KEY, ease REAL NOT NULL, interval REAL NOT NULL, '
+                            'due REAL NOT NULL, reps INTEGER NOT NULL)')
+            self.db.execute('CREATE INDEX IF NOT EXISTS reviews_due ON reviews (due)')
+            self.db.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def add(self, items) -> None:
+        # new items are due right away. Items that are already known keep their state
+        items = list(items)
+        digest = hashlib.sha1('\n'.join(items).encode('utf8')).hexdigest()
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'items'").fetchone()
+        if row and row[0] == digest:
+            return
+        with self.db:
+            self.db.executemany('INSERT OR IGNORE INTO reviews VALUES (?, ?, 0, 0, 0)',
+                                ((item, DEFAULT_EASE) for item in items))
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('items', ?)", (digest,))
+
+    def due(self, now: float = None) -> list:
+        # items to review, the most overdue first
+        now = time.time() if now is None else now
+        return [item for item, in self.db.execute('SELECT item FROM reviews WHERE due <= ? ORDER BY due', (now,))]
+
+    def record(self, results: dict, now: float = None) -> None:
+        """
+        Update the review state of items, from a dict that associates items with whether they were answered correctly.
+        """
+        now = time.time() if now is None else now
+        with self.db:
+            for item, correct in results.items():
+                row = self.db.execute('SELECT ease, interval, reps FROM reviews WHERE item = ?', (item,)).fetchone()
+                ease, interval, reps = schedule(*(row or (DEFAULT_EASE, 0, 0)), correct)
+                self.db.execute('INSERT OR REPLACE INTO reviews VALUES (?, ?, ?, ?, ?)',
+                                (item, ease, interval, now + interval * DAY, reps))
+
+
+def due_learndata(data: dict, store: ReviewStore, now: float = None) -> dict:
+    # only keep items that are due, the most overdue first
+    store.add(data.keys())
+    return items.select(data, [item for item in store.due(now) if item in data])
@@ -0,0 +1,398 @@
+import array
+import asyncio
+import json
+import logging as log
+import os
+import random
+import re
+import secrets
+import time
+from http import HTTPStatus
+
+from src import decks, grading, matching, parser
+
+# sessions that haven't been used for this long (in seconds) are forgotten
+SESSION_TIMEOUT = 3600
+# how often forgotten sessions are looked for, in seconds
+SWEEP_INTERVAL = 60
+# idle connections are closed after this long, in seconds
+KEEP_ALIVE_TIMEOUT = 30
+# connections waiting to be accepted
+BACKLOG = 1024
+# biggest request body accepted, in bytes (answers are short)
+MAX_BODY = 16 * 1024
+
+ROUTES = (
+    ('GET', re.compile(r'/'), 'page'),
+    ('GET', re.compile(r'/decks'), 'list_decks'),
+    ('POST', re.compile(r'/sessions'), 'create_session'),
+    ('GET', re.compile(r'/sessions/([\w-]+)'), 'get_session'),
+    ('DELETE', re.compile(r'/sessions/([\w-]+)'), 'delete_session'),
+    ('POST', re.compile(r'/sessions/([\w-]+)/answers'), 'answer'),
+)
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str = None):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+class Deck:
+    """
+    A learndata file, parsed, filtered and compiled once, and shared by all the sessions that use it.
+    Sessions refer to its questions by their index in `questions`.
+    """
+
+    def __init__(self, name: str, data, flags: parser.FlagsParser):
+        self.name = name
+        self.flags = flags
+        # with --ask-for both, questions are asked in both directions, like answer sheets are graded
+        self.data = data.both() if flags.ask_for == 'both' else data
+        self.questions = list(self.data.keys())
+        self.matchers = matching.compile_answers(self.data, flags)
+
+    def describe(self) -> dict:
+        return {'name': self.name, 'title': self.flags.title, 'count': len(self.questions)}
+
+
+class Session:
+    """
+    A learner's progress in a deck: only the indexes of the questions left to ask, and a few counters.
+    In training mode, questions that weren't found are asked again (like train_loop), in a random order.
+    In testing mode, each question is asked once (like testing_loop), in the deck's order,
+    or in an order of its own if the deck has --ask-order random.
+    """
+    __slots__ = ('deck', 'testing', 'pending', 'position', 'asked_at', 'found', 'notfound', 'last_used')
+
+    def __init__(self, deck: Deck, testing: bool):
+        self.deck = deck
+        self.testing = testing
+        count = len(deck.questions)
+        if testing:
+            shuffled = deck.flags.ask_order == 'random'
+            # the order of the questions, or None for the deck's own order
+            self.pending = array.array('I', random.sample(range(count), count)) if shuffled else None
+            # the index (in self.pending, or in the deck) of the question being asked
+            self.position = 0
+        else:
+            # like PendingPool, without an index map: the position of the question being asked is kept instead
+            self.pending = array.array('I', range(count))
+            self.position = random.randrange(count) if count else 0
+        self.found = 0
+        # indexes of the questions that weren't found (in testing mode)
+        self.notfound = array.array('I')
+        self.asked_at = self.last_used = time.monotonic()
+
+    @property
+    def remaining(self) -> int:
+        if self.testing:
+            return len(self.deck.questions) - self.position
+        return len(self.pending)
+
+    @property
+    def current(self) -> int or None:
+        # index of the question being asked, None once the session is over
+        if not self.remaining:
+            return None
+        if self.testing and self.pending is None:
+            return self.position
+        return self.pending[self.position]
+
+    def answer(self, given: str) -> dict:
+        """
+        Check the answer to the current question, and move on to the next one.
+        Returns whether it was found, and the correct answer if it should be shown.
+        """
+        flags = self.deck.flags
+        question = self.current
+        if question is None:
+            raise HTTPError(HTTPStatus.CONFLICT, 'This session is over')
+        asked = self.deck.questions[question]
+        now = time.monotonic()
+        timed_out = bool(flags.time_limit) and now - self.asked_at > flags.time_limit
+        found = not timed_out and self.deck.matchers[asked].matches(given.strip())
+        result = {'found': found}
+        if timed_out:
+            result['time_is_up'] = True
+
+        if self.testing:
+            if found:
+                self.found += 1
+            else:
+                self.notfound.append(question)
+            self.position += 1
+            if not found and flags.show_answer_in_testing_mode:
+                result['answer'] = self.deck.data[asked]
+        else:
+            if found:
+                self.found += 1
+                # remove the question by putting the last one in its place
+                last = self.pending.pop()
+                if self.position < len(self.pending):
+                    self.pending[self.position] = last
+            else:
+                result['answer'] = self.deck.data[asked]
+            if self.pending:
+                self.position = random.randrange(len(self.pending))
+        self.asked_at = self.last_used = now
+        return result
+
+    def state(self) -> dict:
+        question = self.current
+        state = {
+            'deck'     : self.deck.name,
+            'mode'     : 'testing' if self.testing else 'training',
+            'question' : None if question is None else self.deck.questions[question],
+            'remaining': self.remaining,
+        }
+        if question is not None:
+            state['prompt'] = self.deck.flags.ask_sentence.replace('<>', state['question'])
+            if self.deck.flags.time_limit:
+                state['time_limit'] = self.deck.flags.time_limit
+        elif self.testing:
+            # the grade and the recap, once every question was asked
+            data = self.deck.data
+            state['grade'] = grading.compute_grade(self.found, len(data), self.deck.flags) if data else None
+            state['grade_max'] = self.deck.flags.grade_max
+            state['notfound'] = {asked: data[asked] for asked in map(self.deck.questions.__getitem__, self.notfound)}
+        return state
+
+
+def find_deck_files(paths: list) -> dict:
+    """
+    Get the learndata files to serve: files, directories (searched recursively) and glob patterns.
+    Returns {name: file}, where decks are named after their path (relative to the directory they were found in),
+    without the extension.
+    """
+    files = dict()
+    for path in paths:
+        path = os.path.abspath(os.path.expanduser(path))
+        directory, found = decks.find_decks(path)
+        if not found and os.path.isfile(path):
+            directory, found = os.path.dirname(path), [path]
+        for file in found:
+            name = os.path.splitext(os.path.relpath(file, directory))[0].replace(os.sep, '/')
+            if name in files:
+                log.warning(f'Two decks are named "{name}", only {files[name]} is served')
+                continue
+            files[name] = file
+    return files
+
+
+def load_decks(files: dict) -> dict:
+    # decks are parsed in parallel if there are enough of them, and filtered like a single file is by main()
+    loaded = dict()
+    for (name, file), (data, flags) in zip(files.items(), decks.load_decks(list(files.values()))):
+        flags = parser.FlagsParser(flags)
+        loaded[name] = Deck(name, parser.transform_learndata(data, flags), flags)
+    return loaded
+
+
+class QuizServer:
+    """
+    Serves decks to many learners at once, over HTTP/1.1 with keep-alive, on a single asyncio event loop.
+    Decks and their compiled answers are shared, each learner only gets a small Session.
+
+    JSON API:
+    - GET /decks: the decks that are served
+    - POST /sessions {"deck": name, "mode": "testing" or "training"}: starts a session, and gets its first question
+    - GET /sessions/<id>: the question being asked, or the grade once a testing session is over
+    - POST /sessions/<id>/answers {"answer": text}: answers the question, and gets the next one
+    - DELETE /sessions/<id>: ends a session
+    GET / is a small page that uses this API.
+    There are no WebSockets: each answer gets its next question in the response, so nothing has to be pushed,
+    and a keep-alive connection costs the same per answer without a framing layer on top of the standard library.
+    """
+
+    def __init__(self, served: dict, session_timeout: float = SESSION_TIMEOUT):
+        self.decks = served
+        self.sessions = dict()
+        self.session_timeout = session_timeout
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8080) -> asyncio.AbstractServer:
+        # a whole classroom can connect at once
+        server = await asyncio.start_server(self.handle, host, port, backlog=BACKLOG)
+        # kept referenced, so that the task isn't garbage collected
+        self._sweeper = asyncio.get_running_loop().create_task(self.sweep())
+        return server
+
+    async def sweep(self) -> None:
+        # forget the sessions that weren't used for session_timeout seconds
+        while True:
+            await asyncio.sleep(min(SWEEP_INTERVAL, self.session_timeout))
+            expired = time.monotonic() - self.session_timeout
+            for session_id in [key for key, session in self.sessions.items() if session.last_used < expired]:
+                del self.sessions[session_id]
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # requests of a connection are handled one after the other, until it's closed
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEP_ALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    writer.write(response(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, None, keep_alive=False))
+                    break
+                keep_alive = True
+                try:
+                    method, path, version, headers = parse_head(head)
+                    keep_alive = headers.get('connection', '').lower() != 'close' and version != 'HTTP/1.0'
+                    length = int(headers.get('content-length', 0))
+                    if not 0 <= length <= MAX_BODY:
+                        keep_alive = False
+                        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+                    body = await reader.readexactly(length) if length else b''
+                    status, payload = self.dispatch(method, path, body)
+                except HTTPError as e:
+                    status, payload = e.status, {'error': str(e)}
+                except ValueError as e:
+                    keep_alive = False
+                    status, payload = HTTPStatus.BAD_REQUEST, {'error': str(e)}
+                except asyncio.IncompleteReadError:
+                    break
+                except Exception:
+                    # a bug in a handler: the request was read entirely, so the connection can go on
+                    log.exception(f'Error while handling {method} {path}')
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': 'Internal server error'}
+                writer.write(response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def dispatch(self, method: str, path: str, body: bytes) -> tuple:
+        path = path.partition('?')[0]
+        allowed = False
+        for route_method, pattern, handler in ROUTES:
+            match = pattern.fullmatch(path)
+            if match:
+                allowed = True
+                if route_method == method:
+                    return getattr(self, handler)(*match.groups(), body)
+        raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED if allowed else HTTPStatus.NOT_FOUND)
+
+    def _session(self, session_id: str) -> Session:
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, 'Unknown or expired session')
+        return session
+
+    def page(self, body: bytes) -> tuple:
+        return HTTPStatus.OK, PAGE
+
+    def list_decks(self, body: bytes) -> tuple:
+        return HTTPStatus.OK, {'decks': [deck.describe() for deck in self.decks.values()]}
+
+    def create_session(self, body: bytes) -> tuple:
+        request = parse_json(body)
+        deck = self.decks.get(request.get('deck'))
+        if deck is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, 'Unknown deck')
+        mode = request.get('mode', 'testing')
+        if mode not in ('testing', 'training'):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, 'mode must be "testing" or "training"')
+        session_id = secrets.token_urlsafe(16)
+        session = self.sessions[session_id] = Session(deck, mode == 'testing')
+        return HTTPStatus.CREATED, {'session': session_id, **session.state()}
+
+    def get_session(self, session_id: str, body: bytes) -> tuple:
+        session = self._session(session_id)
+        session.last_used = time.monotonic()
+        return HTTPStatus.OK, session.state()
+
+    def delete_session(self, session_id: str, body: bytes) -> tuple:
+        self._session(session_id)
+        del self.sessions[session_id]
+        return HTTPStatus.NO_CONTENT, None
+
+    def answer(self, session_id: str, body: bytes) -> tuple:
+        session = self._session(session_id)
+        given = parse_json(body).get('answer')
+        if not isinstance(given, str):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, '"answer" must be a string')
+        return HTTPStatus.OK, {**session.answer(given), **session.state()}
+
+
+def parse_head(head: bytes) -> tuple:
+    # the request line and the headers (with lowercase names) of an HTTP request. Raises ValueError if it's malformed
+    lines = head.decode('latin-1').split('\r\n')
+    method, path, version = lines[0].split(' ')
+    headers = dict()
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+    return method, path, version, headers
+
+
+def parse_json(body: bytes) -> dict:
+    try:
+        request = json.loads(body or b'{}')
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, 'The body must be a JSON object')
+    if not isinstance(request, dict):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, 'The body must be a JSON object')
+    return request
+
+
+def response(status: HTTPStatus, payload, keep_alive: bool = True) -> bytes:
+    # payload is JSON-encoded, except for pages (str), which are sent as HTML
+    if payload is None:
+        body, content_type = b'', None
+    elif isinstance(payload, str):
+        body, content_type = payload.encode('utf8'), 'text/html; charset=utf-8'
+    else:
+        body, content_type = json.dumps(payload, ensure_ascii=False).encode('utf8'), 'application/json'
+    head = [f'HTTP/1.1 {status.value} {status.phrase}', f'Content-Length: {len(body)}']
+    if content_type:
+        head.append(f'Content-Type: {content_type}')
+    head.append('Connection: ' + ('keep-alive' if keep_alive else 'close'))
+    return ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body
+
+
+PAGE = '''<!doctype html>
+<html><head><meta charset="utf-8"><meta name="viewport" content="width=device-width">
+<title>Learn it!</title>
+<style>body{font-family:sans-serif;max-width:40em;margin:2em auto;padding:0 1em}.ok{color:green}.ko{color:red}</style>
+</head><body>
+<h1>Learn it!</h1>
+<div id="start"><select id="deck"></select> <select id="mode"><option>testing</option><option>training</option></select>
+<button onclick="start()">Start</button></div>
+<form id="quiz" hidden onsubmit="send(); return false">
+<p id="remaining"></p><p id="prompt"></p><input id="answer" autocomplete="off" autofocus> <button>OK</button></form>
+<p id="result"></p><pre id="recap"></pre>
+<script>
+let session = null;
+const $ = id => document.getElementById(id);
+const call = (method, path, body) => fetch(path, {method, body: JSON.stringify(body)}).then(r => r.json());
+call('GET', '/decks').then(r => r.decks.forEach(d => $('deck').add(new Option(`${d.title || d.name} (${d.count})`, d.name))));
+function show(state) {
+  $('quiz').hidden = state.question === null;
+  $('prompt').textContent = state.prompt || '';
+  $('remaining').textContent = state.remaining + ' to go';
+  if (state.grade !== undefined) {
+    $('result').textContent += ` Grade: ${state.grade}/${state.grade_max}`;
+    $('recap').textContent = Object.entries(state.notfound).map(([q, a]) => q + ' : ' + a).join('\\n');
+  }
+}
+function start() {
+  call('POST', '/sessions', {deck: $('deck').value, mode: $('mode').value}).then(state => {
+    session = state.session; $('result').textContent = $('recap').textContent = ''; show(state); $('answer').focus();
+  });
+}
+function send() {
+  call('POST', `/sessions/${session}/answers`, {answer: $('answer').value}).then(state => {
+    $('answer').value = '';
+    $('result').className = state.found ? 'ok' : 'ko';
+    $('result').textContent = state.found ? '✓' : '✖ ' + (state.answer || '');
+    show(state);
+  });
+}
+</script></body></html>
+'''
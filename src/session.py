@@ -0,0 +1,169 @@
+import os
+import queue
+import sys
+import threading
+
+try:
+    import termios
+    import tty
+except ImportError:
+    # windows
+    termios = tty = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+# how often the keyboard and the lines read by a reader thread are checked, in seconds, when they can't be watched
+POLL_INTERVAL = 0.05
+
+
+def _asyncio():
+    # asyncio is slow to import, it's only imported by the methods that use it, once a session's event loop is running
+    import asyncio
+    return asyncio
+
+
+class Terminal:
+    """
+    Reads the user's answers on an asyncio event loop, so that questions can be timed (see --time-limit),
+    and delays can be skipped by pressing a key, without a thread hanging on input().
+    When stdin is a POSIX terminal, the event loop watches it directly.
+    Otherwise (on Windows, or if the answers are piped), input() is used when there's no time limit. When there is one,
+    lines are read by a daemon thread instead, and the lines typed for a question whose time ran out are discarded.
+    """
+
+    def __init__(self, stdin=None):
+        self.stdin = stdin or sys.stdin
+        # bytes read from the terminal, that don't make a full line yet
+        self._buffer = b''
+        # (line or None at the end of the input) read by the reader thread, if it was started
+        self._lines = None
+        self._timed_out = False
+
+    @property
+    def watchable(self) -> bool:
+        return termios is not None and self.stdin.isatty()
+
+    def write(self, text: str) -> None:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    async def _readable(self, fd: int, timeout: float = None) -> bool:
+        # wait until fd can be read, or until timeout seconds have passed (returns False then)
+        asyncio = _asyncio()
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        loop.add_reader(fd, lambda: ready.done() or ready.set_result(True))
+        try:
+            await asyncio.wait_for(ready, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            loop.remove_reader(fd)
+
+    def _next_line(self) -> str or None:
+        line, newline, rest = self._buffer.partition(b'\n')
+        if not newline:
+            return None
+        self._buffer = rest
+        return line.decode(self.stdin.encoding or 'utf8', errors='replace').rstrip('\r')
+
+    async def input(self, prompt: str = '', timeout: float = None) -> str or None:
+        """
+        Like input(), but returns None if no line was entered within timeout seconds.
+        Raises EOFError at the end of the input.
+        """
+        if self.watchable:
+            return await self._input_watched(prompt, timeout)
+        if timeout is None and self._lines is None:
+            return input(prompt)
+        return await self._input_threaded(prompt, timeout)
+
+    async def _input_watched(self, prompt: str, timeout: float) -> str or None:
+        asyncio = _asyncio()
+        loop = asyncio.get_running_loop()
+        fd = self.stdin.fileno()
+        deadline = None if timeout is None else loop.time() + timeout
+        self.write(prompt)
+        line = self._next_line()
+        while line is None:
+            remaining = None if deadline is None else max(0, deadline - loop.time())
+            if not await self._readable(fd, remaining):
+                # forget what was typed so far
+                termios.tcflush(fd, termios.TCIFLUSH)
+                self.write('\n')
+                return None
+            data = os.read(fd, 4096)
+            if not data:
+                raise EOFError
+            self._buffer += data
+            line = self._next_line()
+        return line
+
+    def _read_lines(self) -> None:
+        for line in self.stdin:
+            self._lines.put(line.rstrip('\r\n'))
+        self._lines.put(None)
+
+    async def _input_threaded(self, prompt: str, timeout: float) -> str or None:
+        asyncio = _asyncio()
+        if self._lines is None:
+            self._lines = queue.Queue()
+            threading.Thread(target=self._read_lines, name='stdin reader', daemon=True).start()
+        if self._timed_out:
+            # lines typed for a question whose time ran out
+            while not self._lines.empty():
+                self._lines.get_nowait()
+            self._timed_out = False
+
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        self.write(prompt)
+        while True:
+            try:
+                line = self._lines.get_nowait()
+                break
+            except queue.Empty:
+                if deadline is not None and loop.time() >= deadline:
+                    self._timed_out = True
+                    self.write('\n')
+                    return None
+                await asyncio.sleep(POLL_INTERVAL)
+        if line is None:
+            # keep the end of the input for the next calls
+            self._lines.put(None)
+            raise EOFError
+        return line
+
+    async def pause(self, delay: float) -> None:
+        # wait for delay seconds, or until a key is pressed
+        asyncio = _asyncio()
+        if delay <= 0:
+            return
+        if self.watchable:
+            fd = self.stdin.fileno()
+            attributes = termios.tcgetattr(fd)
+            # get keys as soon as they're pressed, without showing them
+            tty.setcbreak(fd)
+            try:
+                if await self._readable(fd, delay):
+                    termios.tcflush(fd, termios.TCIFLUSH)
+            finally:
+                termios.tcsetattr(fd, termios.TCSADRAIN, attributes)
+        elif msvcrt is not None and self.stdin.isatty():
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + delay
+            while loop.time() < deadline:
+                if msvcrt.kbhit():
+                    msvcrt.getwch()
+                    return
+                await asyncio.sleep(POLL_INTERVAL)
+        else:
+            await asyncio.sleep(delay)
+
+
+# used by every session, so that lines that were typed ahead aren't lost between them
+terminal = Terminal()
@@ -0,0 +1,146 @@
+import array
+import json
+import os
+import time
+
+from src import helpers, items
+
+# columns of the attempts log, and their array typecodes. Each column is stored in its own file
+COLUMNS = {
+    'item'   : 'I',  # id of the item (its line number in items.txt)
+    'correct': 'B',  # 1 if the answer was correct, 0 otherwise
+    'latency': 'f',  # time taken to answer, in seconds
+    'time'   : 'd',  # when the answer was given (unix timestamp)
+}
+
+
+def stats_path(learndata_file: str) -> str:
+    return helpers.sidecar_path(learndata_file, 'stats')
+
+
+class StatsStore:
+    """
+    Log of every answer given for a learndata file's items, stored as columns in a hidden directory next to it.
+    Answers are appended to the column files as they're given. A summary (attempts and failures per item)
+    is kept up to date incrementally: only the answers logged since the last summary are read.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        # items are stored once, in items.txt, and referenced by their id (line number) in the columns
+        try:
+            with open(self._file('items.txt'), 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            raw = b''
+        # a line that was cut by an interrupted write is dropped, so that new items aren't appended to it
+        complete = raw.rfind(b'\n') + 1
+        if complete < len(raw):
+            os.truncate(self._file('items.txt'), complete)
+        self.items = raw[:complete].decode('utf8').split('\n')[:-1]
+        self.ids = {item: i for i, item in enumerate(self.items)}
+        self._items_file = open(self._file('items.txt'), 'a', encoding='utf8', newline='\n')
+
+        # same for the columns: they're cut to their complete rows, so that new rows line up
+        rows = self.rows()
+        for column, typecode in COLUMNS.items():
+            size = rows * array.array(typecode).itemsize
+            try:
+                if os.path.getsize(self._file(column)) > size:
+                    os.truncate(self._file(column), size)
+            except FileNotFoundError:
+                pass
+        self._columns = {column: open(self._file(column), 'ab') for column in COLUMNS}
+
+        try:
+            with open(self._file('summary.json'), 'r', encoding='utf8') as f:
+                self.summary = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.summary = {'rows': 0, 'attempts': [], 'failures': []}
+        self.refresh_summary()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        self.refresh_summary()
+        self._items_file.close()
+        for f in self._columns.values():
+            f.close()
+
+    def item_id(self, item: str) -> int:
+        if item not in self.ids:
+            self.ids[item] = len(self.items)
+            self.items.append(item)
+            self._items_file.write(item + '\n')
+            self._items_file.flush()
+        return self.ids[item]
+
+    def log(self, item: str, correct: bool, latency: float, timestamp: float = None) -> None:
+        row = {
+            'item'   : self.item_id(item),
+            'correct': int(correct),
+            'latency': latency,
+            'time'   : time.time() if timestamp is None else timestamp,
+        }
+        for column, typecode in COLUMNS.items():
+            array.array(typecode, [row[column]]).tofile(self._columns[column])
+            self._columns[column].flush()
+
+    def rows(self) -> int:
+        # number of complete rows. If a write was interrupted, columns can have different lengths
+        sizes = list()
+        for column, typecode in COLUMNS.items():
+            try:
+                sizes.append(os.path.getsize(self._file(column)) // array.array(typecode).itemsize)
+            except FileNotFoundError:
+                sizes.append(0)
+        return min(sizes)
+
+    def refresh_summary(self) -> None:
+        # read the answers logged since the last summary
+        rows = self.rows()
+        start = self.summary['rows']
+        if rows <= start:
+            return
+
+        new = dict()
+        for column in ('item', 'correct'):
+            values = array.array(COLUMNS[column])
+            with open(self._file(column), 'rb') as f:
+                f.seek(start * values.itemsize)
+                values.fromfile(f, rows - start)
+            new[column] = values
+
+        attempts, failures = self.summary['attempts'], self.summary['failures']
+        missing = max(len(self.items), max(new['item']) + 1) - len(attempts)
+        attempts.extend([0] * missing)
+        failures.extend([0] * missing)
+        for item, correct in zip(new['item'], new['correct']):
+            attempts[item] += 1
+            failures[item] += not correct
+        self.summary['rows'] = rows
+
+        with open(self._file('summary.json.tmp'), 'w', encoding='utf8') as f:
+            json.dump(self.summary, f)
+        os.replace(self._file('summary.json.tmp'), self._file('summary.json'))
+
+    def failure_rate(self, item: str) -> float:
+        # items that were never asked are considered to be failed half of the time
+        i = self.ids.get(item)
+        if i is None or i >= len(self.summary['attempts']):
+            return 0.5
+        return (self.summary['failures'][i] + 1) / (self.summary['attempts'][i] + 2)
+
+
+def hardest_first(data: dict, store: StatsStore) -> dict:
+    # the items that were failed the most often first
+    store.refresh_summary()
+    return items.select(data, sorted(data.keys(), key=store.failure_rate, reverse=True))
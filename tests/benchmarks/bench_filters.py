@@ -0,0 +1,44 @@
+"""
+Compares --blacklist filtering with lists (like transform_learndata used to do) and with compiled ItemFilters.
+
+Run with: python -m tests.benchmarks.bench_filters [--items N] [--entries N]
+"""
+import argparse
+
+from src.filters import ItemFilter
+from tests.benchmarks.common import timeit, synthetic_items, print_table
+
+
+def list_filtering(data: dict, entries: list):
+    return {k: v for k, v in data.items() if k not in entries}
+
+
+def compiled_filtering(data: dict, entries: list):
+    blacklist = ItemFilter(entries)
+    return {k: v for k, v in data.items() if k not in blacklist}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--items', type=int, default=100_000)
+    parser.add_argument('--entries', type=int, default=20_000, help='number of blacklisted items')
+    args = parser.parse_args()
+
+    data = synthetic_items(args.items)
+    # blacklist every other item, up to --entries items
+    literals = [f'key {i}' for i in range(0, 2 * args.entries, 2)]
+    patterns = ['glob:key 1?', 're:key 9+', 'glob:*77']
+
+    rows = list()
+    compiled = timeit(compiled_filtering, data, literals)
+    old = timeit(list_filtering, data, literals, repeat=1)
+    rows.append(('items only', f'{old:.3f}', f'{compiled:.3f}', f'{old / compiled:.0f}x'))
+    with_patterns = timeit(compiled_filtering, data, literals + patterns)
+    rows.append((f'items + {len(patterns)} patterns', '-', f'{with_patterns:.3f}', '-'))
+
+    print(f'{args.items} items, {args.entries} blacklisted items')
+    print_table(rows, ('BLACKLIST', 'LIST (s)', 'COMPILED (s)', 'SPEEDUP'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Compares grading a directory of answer sheets serially and on a process pool.
+
+Run with: python -m tests.benchmarks.bench_grading [--students N] [--items N]
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+
+from src import grading, parser
+from tests.benchmarks.common import timeit, synthetic_items, print_table
+
+
+def write_sheets(directory: str, data: dict, students: int):
+    for student in range(students):
+        with open(os.path.join(directory, f'student {student}.tsv'), 'w', encoding='utf8') as f:
+            for item, answer in data.items():
+                f.write(f'{item}\t{answer if random.random() < 0.8 else "wrong"}\n')
+
+
+def grade_serially(directory: str, data: dict, flags):
+    sheets = dict()
+    for path in grading.sheet_files(directory):
+        with open(path, 'r', encoding='utf8') as f:
+            sheets.update(grading.read_answer_sheets(f, os.path.basename(path)))
+    return grading.grade_sheets(sheets, data, flags)
+
+
+def main():
+    args_parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    args_parser.add_argument('--students', type=int, default=2_000)
+    args_parser.add_argument('--items', type=int, default=500)
+    args = args_parser.parse_args()
+
+    data = synthetic_items(args.items)
+    flags = parser.FlagsParser({'and-syntax': '&&'})
+    directory = tempfile.mkdtemp()
+    try:
+        write_sheets(directory, data, args.students)
+        serial = timeit(grade_serially, directory, data, flags, repeat=1)
+        parallel = timeit(grading.grade_directory, directory, data, flags, repeat=1)
+    finally:
+        shutil.rmtree(directory)
+
+    print(f'{args.students} answer sheets of {args.items} items, {os.cpu_count()} CPUs')
+    print_table([(f'{serial:.2f}', f'{parallel:.2f}', f'{serial / parallel:.1f}x')],
+                ('SERIAL (s)', 'PARALLEL (s)', 'SPEEDUP'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Compares the bounded Damerau-Levenshtein distance used by --typo-tolerance with a full distance matrix.
+
+Run with: python -m tests.benchmarks.bench_matching [--pairs N]
+"""
+import argparse
+import random
+
+from src.matching import bounded_distance
+from tests.benchmarks.common import timeit, print_table
+
+ALPHABET = 'abcdefghijklmnopqrstuvwxyzéèабвгдеёжзий'
+
+
+def full_distance(a: str, b: str) -> int:
+    # textbook optimal string alignment distance, computing the whole matrix
+    d = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        d[i][0] = i
+    for j in range(len(b) + 1):
+        d[0][j] = j
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[-1][-1]
+
+
+def typo(word: str) -> str:
+    i = random.randrange(len(word))
+    return word[:i] + random.choice(ALPHABET) + word[i + 1:]
+
+
+def pairs(count: int, kind: str) -> list:
+    ret = list()
+    for _ in range(count):
+        word = ''.join(random.choice(ALPHABET) for _ in range(random.randint(4, 20)))
+        if kind == 'typo':
+            ret.append((word, typo(word)))
+        else:
+            ret.append((word, ''.join(random.choice(ALPHABET) for _ in range(random.randint(4, 20)))))
+    return ret
+
+
+def grade_full(pairs: list, tolerance: int):
+    return [full_distance(a, b) <= tolerance for a, b in pairs]
+
+
+def grade_bounded(pairs: list, tolerance: int):
+    return [bounded_distance(a, b, tolerance) <= tolerance for a, b in pairs]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--pairs', type=int, default=20_000, help='answers graded per run')
+    args = parser.parse_args()
+
+    rows = list()
+    for kind in ('typo', 'unrelated'):
+        answers = pairs(args.pairs, kind)
+        for tolerance in (1, 2):
+            full = timeit(grade_full, answers, tolerance)
+            bounded = timeit(grade_bounded, answers, tolerance)
+            rows.append((kind, tolerance, f'{full / args.pairs * 1e6:.1f}', f'{bounded / args.pairs * 1e6:.1f}',
+                         f'{full / bounded:.1f}x'))
+
+    print_table(rows, ('ANSWERS', 'TOLERANCE', 'FULL (µs/answer)', 'BOUNDED (µs/answer)', 'SPEEDUP'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Compares the question picking of train_loop before and after PendingPool.
+
+Run with: python -m tests.benchmarks.bench_pool [--picks N]
+"""
+import argparse
+import random
+
+from src.pool import PendingPool
+from tests.benchmarks.common import timeit, synthetic_items, print_table
+
+
+def list_picking(data: dict, picks: int):
+    # the way train_loop used to pick questions
+    found = list()
+    for _ in range(picks):
+        asked = random.choice([key for key in data.keys() if key not in found])
+        found.append(asked)
+
+
+def pool_picking(data: dict, picks: int):
+    pending = PendingPool(data.keys())
+    for _ in range(picks):
+        asked = pending.pick()
+        pending.remove(asked)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--picks', type=int, default=100, help='questions answered correctly per run')
+    args = parser.parse_args()
+
+    rows = list()
+    for count in (1_000, 10_000, 100_000):
+        picks = min(args.picks, count)
+        data = synthetic_items(count)
+        old = timeit(list_picking, data, picks)
+        new = timeit(pool_picking, data, picks)
+        rows.append((count, picks, f'{old / picks * 1e6:.1f}', f'{new / picks * 1e6:.1f}', f'{old / new:.0f}x'))
+
+    print_table(rows, ('ITEMS', 'PICKS', 'LIST (µs/pick)', 'POOL (µs/pick)', 'SPEEDUP'))
+
+
+if __name__ == '__main__':
+    main()
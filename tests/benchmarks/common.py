@@ -0,0 +1,25 @@
+import time
+
+
+def timeit(func, *args, repeat: int = 3, **kwargs) -> float:
+    # best of `repeat` runs, in seconds
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def synthetic_items(count: int) -> dict:
+    return {f'key {i}': f'value {i}' for i in range(count)}
+
+
+def print_table(rows: list, column_names: tuple):
+    widths = [max(len(str(row[i])) for row in rows + [column_names]) for i in range(len(column_names))]
+    print('  '.join(str(name).ljust(width) for name, width in zip(column_names, widths)))
+    print('  '.join('-' * width for width in widths))
+    for row in rows:
+        print('  '.join(str(cell).ljust(width) for cell, width in zip(row, widths)))
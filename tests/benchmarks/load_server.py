@@ -0,0 +1,141 @@
+"""
+Load test of `run.py serve`: many learners answering questions at the same time, on localhost.
+
+Run with: python -m tests.benchmarks.load_server [--users 300] [--items 50] [--error-rate 0.2]
+                                                [--url http://127.0.0.1:8080 --deck path/to/deck.txt]
+Without --url, a server is started in another process with a synthetic deck of --items items.
+Each user opens a keep-alive connection, starts a testing session and answers every question (some of them wrong).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.parse
+
+from src import parser
+from tests.benchmarks.common import print_table
+from tests.benchmarks.synthetic import write_learndata
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def correct_answers(deck_file: str) -> dict:
+    # the answer to give to each question, like the server computes them (see server.Deck)
+    data, flags = parser.parse_file(deck_file)
+    flags = parser.FlagsParser(flags)
+    data = parser.transform_learndata(data, flags)
+    data = data.both() if flags.ask_for == 'both' else data
+    return {asked: answer.split(' || ')[0] for asked, answer in data.items()}
+
+
+def start_server(deck_file: str) -> tuple:
+    # runs `run.py serve` on a free port, and waits for it to print its URL
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'run.py'), 'serve', deck_file, '--port', '0'],
+                              stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    for line in server.stdout:
+        url = re.search(r'http://[\w.:]+', line)
+        if url:
+            return server, url.group(0)
+    raise RuntimeError('The server exited before listening')
+
+
+class Client:
+    # an HTTP/1.1 connection, kept alive between requests
+    def __init__(self, host: str, port: int):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def request(self, method: str, path: str, payload: dict = None) -> tuple:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode() if payload is not None else b''
+        self.writer.write(f'{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Length: {len(body)}\r\n\r\n'.encode() + body)
+        head = (await self.reader.readuntil(b'\r\n\r\n')).decode('latin-1')
+        length = int(re.search(r'content-length: *(\d+)', head, re.IGNORECASE).group(1))
+        content = await self.reader.readexactly(length)
+        return int(head.split(' ', 2)[1]), json.loads(content) if content else None
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+
+
+async def learner(host: str, port: int, deck: str, answers: dict, error_rate: float, rng: random.Random,
+                  latencies: list) -> float:
+    # a whole testing session, returns its grade
+    client = Client(host, port)
+    try:
+        async def timed(*args):
+            start = time.perf_counter()
+            status, response = await client.request(*args)
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                raise RuntimeError(f'{args[0]} {args[1]}: {status} {response}')
+            return response
+
+        state = await timed('POST', '/sessions', {'deck': deck, 'mode': 'testing'})
+        session = state['session']
+        while state['question'] is not None:
+            answer = answers[state['question']] if rng.random() >= error_rate else 'wrong'
+            state = await timed('POST', f'/sessions/{session}/answers', {'answer': answer})
+        await timed('DELETE', f'/sessions/{session}')
+        return state['grade']
+    finally:
+        client.close()
+
+
+async def load_test(url: str, deck: str, answers: dict, users: int, error_rate: float) -> tuple:
+    address = urllib.parse.urlsplit(url)
+    latencies = list()
+    start = time.perf_counter()
+    grades = await asyncio.gather(*(learner(address.hostname, address.port, deck, answers, error_rate, random.Random(i),
+                                            latencies) for i in range(users)))
+    return time.perf_counter() - start, latencies, grades
+
+
+def percentile(values: list, fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    arguments.add_argument('--users', type=int, default=300, help='simultaneous learners')
+    arguments.add_argument('--items', type=int, default=50, help='items of the synthetic deck')
+    arguments.add_argument('--error-rate', type=float, default=0.2, help='share of the answers that are wrong')
+    arguments.add_argument('--url', default=None, help='URL of a running server (requires --deck)')
+    arguments.add_argument('--deck', default=None, help='learndata file served by --url')
+    args = arguments.parse_args()
+    if args.url and not args.deck:
+        arguments.error('--url requires --deck')
+
+    with tempfile.TemporaryDirectory() as directory:
+        server = None
+        deck_file = args.deck
+        if not args.url:
+            deck_file = os.path.join(directory, 'load.txt')
+            write_learndata(deck_file, args.items, preset=False)
+            server, args.url = start_server(deck_file)
+        try:
+            deck = os.path.splitext(os.path.basename(deck_file))[0]
+            elapsed, latencies, grades = asyncio.run(load_test(args.url, deck, correct_answers(deck_file), args.users,
+                                                               args.error_rate))
+        finally:
+            if server:
+                server.terminate()
+                server.wait()
+
+    latencies.sort()
+    print_table([(args.users, len(latencies), f'{elapsed:.2f}', f'{len(latencies) / elapsed:.0f}',
+                  *(f'{percentile(latencies, fraction) * 1000:.1f}' for fraction in (0.5, 0.95, 0.99)),
+                  f'{sum(grades) / len(grades):.1f}')],
+                ('USERS', 'REQUESTS', 'SECONDS', 'REQUESTS/S', 'P50 (ms)', 'P95 (ms)', 'P99 (ms)', 'MEAN GRADE'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmarks of the parser, transform and loop hot paths, on synthetic learndata files.
+
+Run with: python -m tests.benchmarks.suite [--sizes 1000 10000 100000] [--output results.json]
+                                          [--baseline tests/benchmarks/baseline.json] [--save-baseline]
+Results are written as JSON, and compared to the baseline if there is one.
+Exits with status 1 if a benchmark got slower than the baseline by more than --tolerance.
+The baseline is only re-recorded for intended changes (a new benchmark, a new machine, or a slowdown that is worth it),
+with the before/after table that --save-baseline prints in the commit message: re-recording it to get a slowdown through
+turns the check off.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+from unittest import mock
+
+from src import helpers, main as learn_it, parser, session
+from tests.benchmarks.common import timeit, print_table
+from tests.benchmarks.synthetic import write_learndata
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def answer_everything(data: dict, flags):
+    # replaces the session terminal's input(): answers every question correctly (the prompt is the --ask-sentence).
+    # The terminal's stdin isn't read at all, since a terminal reads the file descriptor itself (see session.Terminal)
+    prefix, suffix = flags.ask_sentence.split('<>')
+    suffix += '\n> '
+
+    async def fake_input(prompt: str = '', timeout: float = None):
+        asked = prompt[len(prefix):len(prompt) - len(suffix)]
+        return data[asked].split(' || ')[0]
+
+    return mock.patch.object(session.terminal, 'input', fake_input)
+
+
+def headless(func, data, flags):
+    with answer_everything(data, flags):
+        asyncio.run(func(data, flags))
+
+
+def run_benchmarks(size: int, directory: str, loop_items: int) -> dict:
+    path = os.path.join(directory, f'{size}.txt')
+    write_learndata(path, size)
+    with open(path, 'r', encoding='utf8') as f:
+        lines = f.readlines()
+
+    raw_data, raw_flags = parser.parse(lines)
+    # no sleeping and no screen clearing between questions
+    flags = parser.FlagsParser({**raw_flags, 'clear-screen': False, 'ask-order': 'keep'})
+    data = parser.transform_learndata(raw_data, flags)
+    # the lines that parse_flags leaves to cleanup, and the ones that cleanup leaves to parse_data
+    other_lines = parser.parse_flags(lines)[1]
+    clean_lines = parser.cleanup(other_lines)
+    loop_data = dict(list(data.items())[:loop_items])
+
+    results = {
+        'parse_file'         : timeit(parser.parse_file, path, use_cache=False),
+        'parse_flags'        : timeit(parser.parse_flags, lines),
+        'cleanup'            : timeit(parser.cleanup, other_lines),
+        'parse_data'         : timeit(parser.parse_data, clean_lines),
+        'FlagsParser'        : timeit(parser.FlagsParser, raw_flags),
+        'transform_learndata': timeit(parser.transform_learndata, raw_data, flags),
+        'pprint_dict'        : timeit(helpers.pprint_dict, data, return_str=True),
+        'recap'              : timeit(learn_it.recap, data),
+        'testing_loop'       : timeit(headless, learn_it.testing_loop, loop_data, flags, repeat=1),
+        'train_loop'         : timeit(headless, learn_it.train_loop, loop_data, flags, repeat=1),
+    }
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    rows = list()
+    regressed = False
+    for size, benchmarks in results.items():
+        for name, seconds in benchmarks.items():
+            before = baseline.get(size, {}).get(name)
+            if before is None:
+                rows.append((size, name, '-', f'{seconds:.4f}', '-'))
+                continue
+            ratio = seconds / before
+            status = ''
+            if ratio > tolerance:
+                status = ' SLOWER'
+                regressed = True
+            rows.append((size, name, f'{before:.4f}', f'{seconds:.4f}', f'{ratio:.2f}x{status}'))
+    print_table(rows, ('ITEMS', 'BENCHMARK', 'BASELINE (s)', 'NOW (s)', 'RATIO'))
+    return not regressed
+
+
+def main():
+    args_parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    args_parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000],
+                             help='number of items of the synthetic learndata files (up to 1000000)')
+    args_parser.add_argument('--loop-items', type=int, default=2_000,
+                             help='maximum number of items asked in the testing_loop and train_loop benchmarks')
+    args_parser.add_argument('--output', default=None, help='write the results to this JSON file')
+    args_parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='JSON results to compare with')
+    args_parser.add_argument('--save-baseline', action='store_true', help='write the results to --baseline')
+    args_parser.add_argument('--tolerance', type=float, default=1.25,
+                             help='how many times slower than the baseline a benchmark can get')
+    args = args_parser.parse_args()
+
+    # flags warnings would be shown for every run
+    logging.disable(logging.WARNING)
+    directory = tempfile.mkdtemp()
+    try:
+        # recap prints a lot, and the loops print every question
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = {str(size): run_benchmarks(size, directory, args.loop_items) for size in args.sizes}
+    finally:
+        shutil.rmtree(directory)
+
+    report = {'python': platform.python_version(), 'platform': f'{platform.system()} {platform.machine()}', 'results': results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf8') as f:
+            json.dump(report, f, indent=2)
+
+    baseline = dict()
+    if os.path.isfile(args.baseline):
+        with open(args.baseline, 'r', encoding='utf8') as f:
+            baseline = json.load(f)['results']
+    # the previous baseline is compared too when it's replaced: these are the numbers that justify replacing it
+    ok = compare(results, baseline, args.tolerance)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf8') as f:
+            json.dump(report, f, indent=2)
+    sys.exit(0 if ok or args.save_baseline else 1)
+
+
+if __name__ == '__main__':
+    main()
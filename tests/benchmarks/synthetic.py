@@ -0,0 +1,40 @@
+import random
+
+# flags declared at the top of synthetic learndata files
+FLAGS = (
+    '--title Synthetic deck',
+    '--ask-sentence How do you say <> ?',
+    '--ask-for both',
+    '--grade-max 20',
+    '--typo-tolerance 1',
+    '--blacklist [key 4, re:key 5\\d+]',
+)
+
+
+def learndata_lines(count: int, comments: bool = True, preset: bool = True, seed: int = 0) -> list:
+    """
+    Lines of a learndata file with `count` items, with flags at the top, and comments and blank lines here and there.
+    """
+    rng = random.Random(seed)
+    lines = [flag + '\n' for flag in FLAGS]
+    if preset:
+        lines.append('--preset languages\n')
+    lines.append('\n')
+    for i in range(count):
+        if comments and i % 50 == 0:
+            lines.append(f'# section {i // 50}\n')
+        lines.append(f'key {i}\n')
+        # some answers use the && and || operators
+        answer = f'value {i}'
+        if rng.random() < 0.1:
+            answer += f' || other {i}'
+        elif rng.random() < 0.05:
+            answer += f' && second {i}'
+        lines.append(answer + '\n')
+        lines.append('\n')
+    return lines
+
+
+def write_learndata(path: str, count: int, **kwargs) -> None:
+    with open(path, 'w', encoding='utf8') as f:
+        f.writelines(learndata_lines(count, **kwargs))
@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import src.binary
+import src.items
+import src.parser
+
+LEARNDATA = '''--title Vocabulaire
+--ask-order keep
+--case-sensitive
+--good-grade 0.75
+--whitelist [bank, shore, été]
+--header yes
+
+bank
+banque
+
+bank
+rive
+
+shore
+rive
+
+été
+summer
+
+winter
+hiver
+'''
+
+
+class BinaryDeck(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.deck = os.path.join(self.root, 'deck.deck')
+        self.data, self.flags = src.parser.parse(LEARNDATA.splitlines(keepends=True))
+
+    def test_roundtrip(self):
+        src.binary.write(self.deck, self.data, self.flags)
+        self.assertTrue(src.binary.is_deck(self.deck))
+        data, flags = src.binary.load(self.deck)
+        self.assertEqual(flags, self.flags)
+        self.assertEqual(data, self.data)
+        self.assertEqual(list(data.pairs()), list(self.data.pairs()))
+        self.assertEqual(list(data.view('values').items()), list(self.data.view('values').items()))
+        self.assertEqual(data.keys_of('rive'), ['bank', 'shore'])
+        self.assertNotIn('hiver', data)
+
+    def test_parse_file(self):
+        src.binary.write(self.deck, self.data, self.flags)
+        data, flags = src.parser.parse_file(self.deck)
+        view = src.parser.transform_learndata(data, src.parser.FlagsParser(flags))
+        self.assertEqual(dict(view), {'banque': 'bank', 'rive': 'bank / shore', 'summer': 'été'})
+
+    def test_whitelist_reads_few_strings(self):
+        # a whitelisted view of a big deck only decodes the strings it looks up and asks
+        pairs = [(f'key {i}', f'value {i % 1000}') for i in range(5000)]
+        src.binary.write(self.deck, src.items.ItemStore(pairs), self.flags)
+        data, _ = src.binary.load(self.deck)
+        decoded = list()
+        original = src.items.MappedItemStore._str
+
+        def _str(store, string):
+            decoded.append(string)
+            return original(store, string)
+
+        with mock.patch.object(src.items.MappedItemStore, '_str', _str), \
+                mock.patch.object(src.items.ItemStore, '_strings_as', side_effect=AssertionError('the whole store is read')):
+            view = data.view('both', keys=['key 7', 'key 1007', 'key 9999'])
+            self.assertEqual(dict(view), {'key 7': 'value 7', 'key 1007': 'value 7', 'value 7': 'key 7 / key 1007'})
+        self.assertLess(len(decoded), 100)
+
+    def test_dump(self):
+        data, flags = src.parser.parse(src.parser.dump(self.data, self.flags))
+        self.assertEqual(flags, self.flags)
+        self.assertEqual(list(data.pairs()), list(self.data.pairs()))
+
+    def test_not_a_deck(self):
+        text = os.path.join(self.root, 'deck.txt')
+        with open(text, 'w', encoding='utf8') as f:
+            f.write(LEARNDATA)
+        self.assertFalse(src.binary.is_deck(text))
+        with self.assertRaises(ValueError):
+            src.binary.load(text)
+
+
+if __name__ == '__main__':
+    unittest.main()
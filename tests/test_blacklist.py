@@ -0,0 +1,43 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src import blacklist, filters
+
+
+class Blacklist(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.learndata_file = os.path.join(self.root, 'deck.txt')
+        self.path = blacklist.blacklist_path(self.learndata_file)
+
+    def test_append(self):
+        self.assertEqual(blacklist.add_to_blacklist(self.path, ['a', 'b', 'a']), ['a', 'b'])
+        self.assertEqual(blacklist.add_to_blacklist(self.path, ['b', 'c', 'd'], known=['d']), ['c'])
+        self.assertEqual(blacklist.read_blacklist(self.path), (['a', 'b', 'c'], True))
+
+    def test_interrupted_write(self):
+        with open(self.path, 'w', encoding='utf8') as f:
+            f.write('a\nb')
+        self.assertEqual(blacklist.read_blacklist(self.path), (['a'], False))
+        blacklist.add_to_blacklist(self.path, ['c'])
+        self.assertEqual(blacklist.read_blacklist(self.path), (['a', 'c'], True))
+
+    def test_merge(self):
+        blacklist.add_to_blacklist(self.path, ['b', 'c'])
+        flags = blacklist.merge_blacklist({'blacklist': ['a', 'b']}, self.learndata_file)
+        self.assertEqual(flags, {'blacklist': ['a', 'b', 'c']})
+
+    def test_merge_items_like_patterns(self):
+        # items of the blacklist file are never patterns
+        blacklist.add_to_blacklist(self.path, ['re:(', 'glob:*', 're:a.c'])
+        flags = blacklist.merge_blacklist({'blacklist': ['glob:x*']}, self.learndata_file)
+        blacklisted = filters.ItemFilter(flags['blacklist'])
+        self.assertIn('re:(', blacklisted)
+        self.assertIn('glob:*', blacklisted)
+        self.assertIn('xyz', blacklisted)
+        self.assertNotIn('abc', blacklisted)
+        self.assertNotIn('re:abc', blacklisted)
+        self.assertNotIn('anything', blacklisted)
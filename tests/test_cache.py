@@ -0,0 +1,39 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import src.cache
+import src.parser
+
+
+class Cache(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.file = os.path.join(self.root, 'deck.txt')
+        with open(self.file, 'w', encoding='utf8') as f:
+            f.write('--title Cached\nHello\nBonjour\n')
+        patcher = mock.patch('src.cache.CACHE_DIR', os.path.join(self.root, '.cache'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def test_roundtrip(self):
+        self.assertIsNone(src.cache.load(self.file))
+        parsed = src.parser.parse_file(self.file)
+        self.assertEqual(src.cache.load(self.file), parsed)
+        self.assertEqual(parsed, ({'Hello': 'Bonjour'}, {'title': 'Cached'}))
+
+    def test_invalidated_by_changes(self):
+        src.parser.parse_file(self.file)
+        with open(self.file, 'a', encoding='utf8') as f:
+            f.write('\nBye\nAurevoir\n')
+        self.assertIsNone(src.cache.load(self.file))
+        self.assertEqual(src.parser.parse_file(self.file)[0], {'Hello': 'Bonjour', 'Bye': 'Aurevoir'})
+
+    def test_touched_but_unchanged(self):
+        parsed = src.parser.parse_file(self.file)
+        stat = os.stat(self.file)
+        os.utime(self.file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertEqual(src.cache.load(self.file), parsed)
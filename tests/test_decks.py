@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from src import decks
+
+
+class Decks(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        os.mkdir(os.path.join(self.root, 'sub'))
+        # enough files to use the process pool
+        for i in range(decks.PARALLEL_THRESHOLD):
+            self.write(os.path.join('sub', f'{i}.txt'), f'--ask-for keys\nkey {i}\nvalue {i}\n')
+        self.write('first.txt', '--title First\n--ask-order keep\nHello\nBonjour\n')
+        self.write('.hidden.txt', 'Hidden\nCaché\n')
+        # the cache shouldn't be written in the user's LEARNDATA_ROOT
+        patcher = mock.patch('src.cache.CACHE_DIR', os.path.join(self.root, 'no-such-dir', '.cache'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write(self, name, contents):
+        with open(os.path.join(self.root, name), 'w', encoding='utf8') as f:
+            f.write(contents)
+
+    def test_find_directory(self):
+        directory, files = decks.find_decks(self.root)
+        self.assertEqual(directory, self.root)
+        self.assertEqual(len(files), decks.PARALLEL_THRESHOLD + 1)
+        self.assertEqual(files[0], os.path.join(self.root, 'first.txt'))
+
+    def test_find_pattern(self):
+        directory, files = decks.find_decks(os.path.join(self.root, 's*', '1*.txt'))
+        self.assertEqual(directory, self.root)
+        self.assertEqual(files, [os.path.join(self.root, 'sub', '1.txt')])
+
+    def test_not_a_deck_list(self):
+        self.assertEqual(decks.find_decks(os.path.join(self.root, 'first.txt'))[1], [])
+
+    def test_merge(self):
+        _, files = decks.find_decks(self.root)
+        data, flags, sources, full_data_count = decks.merge_decks(files, decks.load_decks(files))
+        self.assertEqual(flags.title, 'First')
+        self.assertEqual(full_data_count, len(files))
+        # the first file asks for values, the other ones for keys
+        self.assertEqual(list(data.items())[:2], [('Bonjour', 'Hello'), ('key 0', 'value 0')])
+        self.assertEqual(sources['key 3'], (os.path.join(self.root, 'sub', '3.txt'), ['key 3']))
+
+    def test_merge_values(self):
+        # the questions of decks that ask for values are the values, but their blacklists are about keys
+        self.write('second.txt', '--ask-for values\nBye\nAu revoir\n\nThanks\nMerci\n')
+        files = [os.path.join(self.root, name) for name in ('first.txt', 'second.txt', os.path.join('sub', '0.txt'))]
+        data, _, sources, _ = decks.merge_decks(files, decks.load_decks(files))
+        self.assertEqual(list(data), ['Bonjour', 'Au revoir', 'Merci', 'key 0'])
+        self.assertEqual(sources['Merci'], (files[1], ['Thanks']))
+        self.assertEqual(decks.group_by_deck(['Bonjour', 'Merci', 'key 0'], sources),
+                         {files[0]: ['Hello'], files[1]: ['Thanks'], files[2]: ['key 0']})
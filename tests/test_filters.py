@@ -0,0 +1,42 @@
+import unittest
+
+from src.filters import ItemFilter
+from src.parser import parse_flag_type
+
+
+class Filters(unittest.TestCase):
+    def test_items_and_patterns(self):
+        item_filter = ItemFilter(['spam', 'glob:eg*', 're:fo+'])
+        self.assertIn('spam', item_filter)
+        self.assertIn('eggs', item_filter)
+        self.assertIn('fooo', item_filter)
+        self.assertNotIn('food', item_filter)
+        self.assertNotIn('bacon', item_filter)
+
+    def test_invalid_regex(self):
+        item_filter = ItemFilter(['re:(', 'spam'])
+        self.assertIn('spam', item_filter)
+        self.assertEqual(item_filter.patterns, [])
+
+    def test_global_flags(self):
+        item_filter = ItemFilter(['re:(?i)foo', 're:bar'])
+        self.assertIn('FOO', item_filter)
+        self.assertIn('bar', item_filter)
+        self.assertNotIn('BAR', item_filter)
+
+    def test_backreferences(self):
+        # joined, the second pattern's \1 would refer to the first one's group
+        item_filter = ItemFilter(['re:(a)\\1', 're:(b)\\1', 'glob:c*'])
+        self.assertIn('aa', item_filter)
+        self.assertIn('bb', item_filter)
+        self.assertIn('cat', item_filter)
+        self.assertNotIn('ab', item_filter)
+
+    def test_joined(self):
+        self.assertEqual(len(ItemFilter(['glob:eg*', 're:fo+', 're:(?:ba)+']).patterns), 1)
+
+    def test_empty(self):
+        self.assertFalse(ItemFilter([]))
+
+    def test_parse_patterns_list(self):
+        self.assertEqual(parse_flag_type('[spam, glob:*ing, re:\\w+s]'), ['spam', 'glob:*ing', 're:\\w+s'])
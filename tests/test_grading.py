@@ -0,0 +1,68 @@
+import argparse
+import io
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from src import grading, items, main, parser
+
+
+class Grading(unittest.TestCase):
+    def setUp(self):
+        self.flags = parser.FlagsParser({'grade-max': 20})
+        self.data = {'Hello': 'Bonjour', 'Bye': 'Aurevoir || Salut'}
+
+    def test_read_sheets(self):
+        sheets = grading.read_answer_sheets(['alice\tHello\tbonjour\n', 'Bye\tsalut\n', '\n', 'bob\tHello\t\n'])
+        self.assertEqual(sheets, {
+            'alice': {'Hello': 'bonjour'}, grading.DEFAULT_STUDENT: {'Bye': 'salut'}, 'bob': {'Hello': ''},
+        })
+
+    def test_grade_sheets(self):
+        sheets = {'alice': {'Hello': 'bonjour', 'Bye': 'salut'}, 'bob': {'Hello': 'bonjour'}}
+        results = grading.grade_sheets(sheets, self.data, self.flags)
+        self.assertEqual([(r['student'], r['grade'], r['notfound']) for r in results],
+                         [('alice', 20.0, []), ('bob', 10.0, ['Bye'])])
+
+    def test_write_results(self):
+        results = grading.grade_sheets({'alice': {'Hello': 'bonjour'}}, self.data, self.flags)
+        output = io.StringIO()
+        grading.write_results(results, output, 'json')
+        self.assertEqual(json.loads(output.getvalue())[0]['found'], 1)
+        output = io.StringIO()
+        grading.write_results(results, output, 'csv')
+        self.assertEqual(output.getvalue().splitlines()[1], 'alice,10.0,1,2,Bye')
+
+    def test_empty_deck(self):
+        # eg. when the blacklist contains every item
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        answers, output = os.path.join(root, 'answers.tsv'), os.path.join(root, 'grades.json')
+        with open(answers, 'w', encoding='utf8') as f:
+            f.write('alice\tHello\tbonjour\n')
+        args = argparse.Namespace(answers=answers, output=output, format=None)
+        self.assertEqual(main.grade_answer_sheets(args, items.ItemStore().view(), self.flags), 1)
+        self.assertFalse(os.path.exists(output))
+
+
+class GradeDirectory(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        for student, answer in (('alice', 'salut'), ('bob', 'nope'), ('carol', 'aurevoir')):
+            with open(os.path.join(self.root, student + '.tsv'), 'w', encoding='utf8') as f:
+                f.write(f'Hello\tbonjour\nBye\t{answer}\n')
+        self.flags = parser.FlagsParser({})
+        self.data = {'Hello': 'Bonjour', 'Bye': 'Aurevoir || Salut'}
+
+    def test_flags_pickling(self):
+        self.assertEqual(pickle.loads(pickle.dumps(self.flags)).__dict__(), self.flags.__dict__())
+
+    def test_grade_directory(self):
+        results = grading.grade_directory(self.root, self.data, self.flags, workers=2)
+        self.assertEqual([(r['student'], r['found']) for r in results], [('alice', 2), ('bob', 1), ('carol', 2)])
+        report = grading.items_report(results, self.data)
+        self.assertEqual(report[0], {'item': 'Bye', 'errors': 1, 'sheets': 3, 'error_rate': 0.3333})
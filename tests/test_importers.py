@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src import importers, parser
+
+
+def parse_table(text: str, delimiter: str = 'comma') -> tuple:
+    data, flags = parser.parse(text.splitlines(keepends=True), lambda lines: importers.iter_table(lines, delimiter))
+    return list(data.pairs()), flags
+
+
+class Table(unittest.TestCase):
+    def test_csv(self):
+        pairs, flags = parse_table('hello,bonjour\n"big, large", grand\nhello,salut\nalone\n')
+        self.assertEqual(pairs, [('hello', 'bonjour'), ('big, large', 'grand'), ('hello', 'salut')])
+        self.assertEqual(flags, {})
+
+    def test_column_flags(self):
+        pairs, flags = parse_table('--key-column 3\n--value-column 1\n--skip-first-row\n--title Animals\n'
+                                   'french,notes,english\nchat,,cat\n')
+        self.assertEqual(pairs, [('cat', 'chat')])
+        self.assertEqual(flags['title'], 'Animals')
+
+        pairs, _ = parse_table('--delimiter semicolon\na;b,c\n')
+        self.assertEqual(pairs, [('a', 'b,c')])
+
+    def test_anki(self):
+        pairs, _ = parse_table('#separator:tab\n#html:true\n#notetype column:1\n#tags column:4\n'
+                               'Basic\t<b>dog</b>\tle&nbsp;chien<br>un chien\tanimals\n', 'tab')
+        self.assertEqual(pairs, [('dog', 'le chien un chien')])
+
+
+class ReaderFor(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def write(self, name: str, text: str) -> str:
+        path = os.path.join(self.root, name)
+        with open(path, 'w', encoding='utf8') as f:
+            f.write(text)
+        return path
+
+    def test_detection(self):
+        self.assertIsNotNone(importers.reader_for(self.write('deck.tsv', 'a\tb\n')))
+        self.assertIsNotNone(importers.reader_for(self.write('anki.txt', '--title Anki\n#separator:tab\na\tb\n')))
+        self.assertIsNone(importers.reader_for(self.write('deck.txt', '--title Deck\n# comment\na\nb\n')))
+        self.assertIsNone(importers.reader_for(self.write('chapter.txt', '# Chapter 1: greetings\nhello\nbonjour\n')))
+        self.assertIsNone(importers.reader_for(self.write('notes.txt', '#note:todo\nhello\nbonjour\n')))
+
+    def test_parse_file(self):
+        path = self.write('deck.tsv', 'cat\tchat\r\ndog\t"chien\nloup"\r\n')
+        data, _ = parser.parse_file(path, use_cache=False)
+        self.assertEqual(list(data.pairs()), [('cat', 'chat'), ('dog', 'chien\nloup')])
+
+    def test_byte_order_mark(self):
+        path = self.write('excel.csv', '\ufeffcat,chat\ndog,chien\n')
+        data, _ = parser.parse_file(path, use_cache=False)
+        self.assertEqual(list(data.pairs()), [('cat', 'chat'), ('dog', 'chien')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import pickle
+import unittest
+
+from src import items, matching, parser
+
+
+class Flags:
+    case_sensitive = False
+    fold_accents = False
+    typo_tolerance = 0
+    and_syntax = '&&'
+    or_syntax = '||'
+
+
+class Store(unittest.TestCase):
+    def setUp(self):
+        self.store = items.ItemStore([('bank', 'banque'), ('bank', 'rive'), ('shore', 'rive'), ('bank', 'banque')])
+
+    def test_duplicates(self):
+        self.assertEqual(self.store.values_of('bank'), ['banque', 'rive'])
+        self.assertEqual(self.store.keys_of('rive'), ['bank', 'shore'])
+        self.assertEqual(list(self.store.pairs()), [('bank', 'banque'), ('bank', 'rive'), ('shore', 'rive')])
+        self.assertEqual(self.store, {'bank': 'banque / rive', 'shore': 'rive'})
+
+    def test_parse_keeps_duplicates(self):
+        data, _ = parser.parse(['Hello\n', 'Bonjour\n', '\n', 'Hello\n', 'Salut\n'])
+        self.assertEqual(data.values_of('Hello'), ['Bonjour', 'Salut'])
+
+    def test_filter(self):
+        view = self.store.view('values', keep=lambda key: key != 'bank')
+        self.assertEqual(view, {'rive': 'shore'})
+        self.assertEqual(list(view.inverted()), ['shore'])
+
+    def test_state(self):
+        store = items.ItemStore((f'clé {i}', f'valeur {i % 7}') for i in range(1000))
+        self.assertEqual(len(store), 1000)
+        self.assertEqual(store.keys_of('valeur 3')[:2], ['clé 3', 'clé 10'])
+        restored = items.ItemStore.from_state(store.state())
+        self.assertEqual(restored, store)
+        self.assertEqual(pickle.loads(pickle.dumps(store)).values_of('clé 999'), ['valeur 5'])
+
+    def test_not_ascii(self):
+        # strings are decoded at once when they're all different: offsets count bytes
+        store = items.ItemStore([('été', 'summer'), ('hiver', 'winter'), ('naïve', 'naive')])
+        self.assertEqual(store.view(keep=lambda key: key != 'hiver'), {'été': 'summer', 'naïve': 'naive'})
+        self.assertEqual(store.keys_of('naive'), ['naïve'])
+
+    def test_chunks(self):
+        # pairs are added EXTEND_CHUNK at a time: duplicates and chains have to work across chunks
+        pairs = [('bank', 'banque'), ('shore', 'rive'), ('bank', 'rive'), ('shore', 'rive'), ('rive', 'bank')] * 3
+        chunk_size = items.EXTEND_CHUNK
+        items.EXTEND_CHUNK = 2
+        try:
+            store = items.ItemStore(pairs)
+        finally:
+            items.EXTEND_CHUNK = chunk_size
+        self.assertEqual(list(store.pairs()), list(items.ItemStore(pairs).pairs()))
+        self.assertEqual(store.keys_of('rive'), ['shore', 'bank'])
+        self.assertEqual(list(store), ['bank', 'shore', 'rive'])
+        self.assertEqual(list(store.view('values')), ['banque', 'rive', 'bank'])
+
+
+class View(unittest.TestCase):
+    def setUp(self):
+        self.store = items.ItemStore([('bank', 'banque'), ('bank', 'rive'), ('shore', 'rive')])
+
+    def test_inverted(self):
+        inverted = self.store.view().inverted()
+        self.assertEqual(list(inverted), ['banque', 'rive'])
+        self.assertEqual(inverted.answers('rive'), ['bank', 'shore'])
+        self.assertEqual(inverted.items_of('rive'), ['bank', 'shore'])
+
+    def test_reorder(self):
+        view = items.select(self.store.view(), ['shore'])
+        self.assertEqual(view, {'shore': 'rive'})
+        self.assertNotIn('bank', view)
+        self.assertEqual(list(view.inverted()), ['rive'])
+
+    def test_both(self):
+        both = self.store.view().both()
+        self.assertEqual(list(both), ['bank', 'shore', 'banque', 'rive'])
+        self.assertEqual(both.answers('rive'), ['bank', 'shore'])
+
+    def test_any_answer_matches(self):
+        matchers = matching.compile_answers(self.store.view(), Flags)
+        self.assertTrue(matchers['bank'].matches('rive'))
+        self.assertTrue(matchers['bank'].matches('Banque'))
+        self.assertFalse(matchers['shore'].matches('banque'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from src import journal, main, reviews, session, stats
+
+SETTINGS = {'testing': True, 'ask_for': 'keys', 'questions': ['b', 'a', 'c']}
+
+
+class Journal(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.path = journal.journal_path(os.path.join(self.root, 'deck.txt'))
+
+    def interrupted_session(self):
+        session = journal.Journal(self.path)
+        session.start(SETTINGS)
+        session.log(0, 'b', True)
+        session.log(1, 'été', False)
+        session.close()
+
+    def test_resume(self):
+        self.interrupted_session()
+        session = journal.Journal(self.path)
+        self.assertEqual(session.load(), (SETTINGS, [(0, 'b', True), (1, 'été', False)]))
+        session.start()
+        session.log(0, 'a', False)
+        session.close()
+        self.assertEqual(journal.Journal(self.path).load()[1], [(0, 'b', True), (1, 'été', False), (0, 'a', False)])
+
+    def test_cut_line(self):
+        self.interrupted_session()
+        with open(self.path, 'a', encoding='utf8') as f:
+            f.write('[0, "c", tr')
+        session = journal.Journal(self.path)
+        self.assertEqual(len(session.load()[1]), 2)
+        # the cut line is dropped when the session goes on
+        session.start()
+        session.log(0, 'c', True)
+        session.close()
+        self.assertEqual(journal.Journal(self.path).load()[1][-1], (0, 'c', True))
+
+    def test_finish(self):
+        self.assertIsNone(journal.Journal(self.path).load())
+        self.interrupted_session()
+        session = journal.Journal(self.path)
+        session.load()
+        session.start()
+        session.finish()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertIsNone(session.load())
+
+
+class Resume(unittest.TestCase):
+    # whole sessions, through main(), that continue an interrupted one
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.deck = os.path.join(self.root, 'deck.txt')
+        # the cache shouldn't be written in the user's LEARNDATA_ROOT
+        patcher = mock.patch('src.cache.CACHE_DIR', os.path.join(self.root, '.cache'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_session(self, ask_order: str, settings: dict, answers: list, record_stats: bool = False) -> list:
+        # returns the questions that were asked, every one of them is answered correctly
+        with open(self.deck, 'w', encoding='utf8') as f:
+            f.write(f'--ask-order {ask_order}\n--ask-for keys\n--record-stats {str(record_stats).lower()}\n'
+                    f'--clear-screen false\n\n')
+            f.write('\n\n'.join(f'{key}\n{key.upper()}' for key in 'abcd') + '\n')
+        with open(journal.journal_path(self.deck), 'w', encoding='utf8') as f:
+            f.writelines(json.dumps(line) + '\n' for line in (settings, *answers))
+        asked = list()
+
+        async def answer(prompt: str = '', timeout: float = None) -> str:
+            asked.append(prompt.split('\n')[0])
+            return asked[-1].upper()
+
+        args = argparse.Namespace(file=self.deck, resume=True, profile=None, recap=os.path.join(self.root, 'recap.txt'))
+        with mock.patch.object(session.terminal, 'input', answer), contextlib.redirect_stdout(io.StringIO()):
+            main.main(args)
+        return asked
+
+    def test_random_order(self):
+        settings = {'testing': True, 'ask_for': 'keys', 'questions': ['c', 'a', 'd', 'b']}
+        # the answered questions are skipped, and the other ones asked in the same order
+        self.assertEqual(self.run_session('random', settings, [[0, 'c', True], [0, 'a', False]]), ['d', 'b'])
+        self.assertFalse(os.path.exists(journal.journal_path(self.deck)))
+
+    def test_review_results(self):
+        settings = {'testing': False, 'ask_for': 'keys', 'questions': None}
+        with mock.patch.object(reviews.ReviewStore, 'record') as record:
+            asked = self.run_session('due', settings, [[0, 'c', True], [0, 'a', False], [0, 'a', True]])
+        self.assertEqual(sorted(asked), ['b', 'd'])
+        # the replayed answers count, a question is only correct if it was found the first time
+        self.assertEqual(record.call_args.args[0], {'a': False, 'b': True, 'c': True, 'd': True})
+
+    def test_unwritable_journal(self):
+        # eg. a deck in a read-only directory: the session goes on without a journal
+        settings = {'testing': True, 'ask_for': 'keys', 'questions': ['c', 'a', 'd', 'b']}
+        with mock.patch.object(journal.Journal, 'start', side_effect=PermissionError(13, 'Permission denied')), \
+                self.assertLogs(level='WARNING') as logs:
+            self.assertEqual(self.run_session('random', settings, [[0, 'c', True]]), ['a', 'd', 'b'])
+        self.assertIn('Permission denied', logs.output[0])
+
+    def test_unwritable_stats(self):
+        # a file where the stats directory would go: the session goes on without stats
+        with open(stats.stats_path(self.deck), 'w', encoding='utf8'):
+            pass
+        settings = {'testing': True, 'ask_for': 'keys', 'questions': ['c', 'a', 'd', 'b']}
+        with self.assertLogs(level='WARNING') as logs:
+            self.assertEqual(self.run_session('random', settings, [], record_stats=True), ['c', 'a', 'd', 'b'])
+        self.assertIn(os.path.basename(stats.stats_path(self.deck)), logs.output[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+from src import matching
+
+
+class Normalize(unittest.TestCase):
+    def test_whitespace_and_case(self):
+        self.assertEqual(matching.normalize('  Hello   World '), 'hello world')
+        self.assertEqual(matching.normalize('Hello', case_sensitive=True), 'Hello')
+
+    def test_fold_accents(self):
+        self.assertEqual(matching.normalize('Élève', fold_accents=True), 'eleve')
+        self.assertEqual(matching.normalize('Ёжик чай', fold_accents=True), 'ежик чаи')
+        self.assertEqual(matching.normalize('молоко́', fold_accents=True), 'молоко')
+        self.assertEqual(matching.normalize('cœur', fold_accents=True), 'coeur')
+
+    def test_composed_and_decomposed(self):
+        self.assertEqual(matching.normalize('é'), matching.normalize('é'))
+
+
+class Distance(unittest.TestCase):
+    def test_distances(self):
+        self.assertEqual(matching.bounded_distance('bonjour', 'bonjour', 1), 0)
+        self.assertEqual(matching.bounded_distance('bonjour', 'bnojour', 1), 1)
+        self.assertEqual(matching.bounded_distance('bonjour', 'bonjur', 1), 1)
+        self.assertEqual(matching.bounded_distance('kitten', 'sitting', 3), 3)
+
+    def test_bounded(self):
+        self.assertEqual(matching.bounded_distance('kitten', 'sitting', 2), 3)
+        self.assertEqual(matching.bounded_distance('a', 'abcdef', 2), 3)
+
+
+def matcher(answer, typo_tolerance=0, fold_accents=False):
+    return matching.AnswerMatcher(matching.split_answer(answer, '&&', '||'), typo_tolerance=typo_tolerance,
+                                  fold_accents=fold_accents)
+
+
+class SplitAnswer(unittest.TestCase):
+    def test_operators(self):
+        self.assertEqual(matching.split_answer('Bus || Car && Salut', '&&', '||'), [['Bus ', ' Car '], [' Salut']])
+
+    def test_escaping(self):
+        self.assertEqual(matching.split_answer('Tom \\&& Jerry || Spike', '&&', '||'), [['Tom && Jerry ', ' Spike']])
+
+    def test_overlapping_operators(self):
+        self.assertEqual(matching.split_answer('a&b&&c', '&', '&&'), [['a'], ['b', 'c']])
+
+
+class Matcher(unittest.TestCase):
+    def test_single(self):
+        self.assertTrue(matcher('Bonjour').matches(' bonjour '))
+        self.assertFalse(matcher('Bonjour').matches('bonjuor'))
+        self.assertTrue(matcher('Bonjour', typo_tolerance=1).matches('bonjuor'))
+        self.assertTrue(matcher('école', fold_accents=True).matches('ecole'))
+        self.assertTrue(matcher('').matches(''))
+
+    def test_or(self):
+        self.assertTrue(matcher('Bus || Car').matches('car'))
+        self.assertFalse(matcher('Bus || Car').matches('bus, car'))
+
+    def test_and(self):
+        answer = matcher('Bonjour && Salut || Coucou')
+        self.assertTrue(answer.matches('salut && bonjour'))
+        self.assertTrue(answer.matches('Bonjour && Coucou'))
+        self.assertFalse(answer.matches('bonjour'))
+        self.assertFalse(answer.matches('bonjour && bonjour'))
+        self.assertFalse(answer.matches('salut && coucou'))
+
+    def test_comma_in_alternative(self):
+        # commas don't separate the parts of an answer
+        answer = matcher('Yes, sir || Indeed && Thanks')
+        self.assertTrue(answer.matches('yes, sir && thanks'))
+        self.assertTrue(answer.matches('Thanks && Indeed'))
+        self.assertFalse(answer.matches('yes && sir && thanks'))
+
+    def test_and_with_typos(self):
+        self.assertTrue(matcher('Bonjour && Salut', typo_tolerance=1).matches('slut && bonjor'))
@@ -1,4 +1,6 @@
+import json
 import os
+import tempfile
 import unittest
 
 import src.helpers
@@ -54,10 +56,39 @@ class Data(unittest.TestCase):
         })
         self.assertEqual(flags, {})
 
+    def test_parse_file(self):
+        # parsing a file object directly (read line by line) gives the same result as parsing its lines
+        self.assertEqual(src.parser.parse_file(learndata_path('test_data.txt'), use_cache=False), src.parser.parse(learndata('test_data')))
+
+    def test_iter_parse(self):
+        lines = ['\n', '--title Test\n', 'Hello\n', 'Bonjour\n', '# comment\n', '\n', '\n', 'Bye\n', '\n', '\n']
+        self.assertEqual(list(src.parser.iter_parse(lines)), [
+            ('flag', 'title', 'Test'), ('item', 'Hello', 'Bonjour'), ('item', '', 'Bye'), ('item', 'Bye', ''),
+        ])
+
 class FlagsValueChecking(unittest.TestCase):
     def test_illegal_value(self):
         lines = learndata('test_flag_illegal_value')
         data, flags = src.parser.parse(lines)
         flags = src.parser.FlagsParser(flags)
         self.assertEqual(data, {})
-        self.assertEqual(flags.ask_order, src.consts.FLAGS_DEFAULTS['ask-order'])
\ No newline at end of file
+        self.assertEqual(flags.ask_order, src.consts.FLAGS_DEFAULTS['ask-order'])
+
+class PresetsRegistry(unittest.TestCase):
+    def test_reload_on_change(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'presets.json')
+            with open(path, 'w', encoding='utf8') as f:
+                json.dump({'quick': {'--ask-order': 'keep'}}, f)
+            registry = src.parser.PresetRegistry(path)
+            presets = registry.presets()
+            self.assertEqual(presets, {'quick': {'ask-order': 'keep'}})
+            self.assertIs(registry.presets(), presets)
+
+            with open(path, 'w', encoding='utf8') as f:
+                json.dump({'quick': {'--ask-order': 'alphabetical'}}, f)
+            os.utime(path, ns=(0, 0))
+            self.assertEqual(registry.presets(), {'quick': {'ask-order': 'alphabetical'}})
+
+    def test_missing_file(self):
+        self.assertIsNone(src.parser.PresetRegistry(os.path.join('nowhere', 'presets.json')).presets())
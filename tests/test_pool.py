@@ -0,0 +1,22 @@
+import unittest
+
+from src.pool import PendingPool
+
+
+class Pool(unittest.TestCase):
+    def test_remove(self):
+        pool = PendingPool(['a', 'b', 'c', 'd'])
+        pool.remove('b')
+        pool.remove('d')
+        self.assertEqual(sorted(pool), ['a', 'c'])
+        self.assertNotIn('b', pool)
+        self.assertEqual(len(pool), 2)
+
+    def test_pick_until_empty(self):
+        pool = PendingPool(str(i) for i in range(50))
+        picked = list()
+        while pool:
+            item = pool.pick()
+            pool.remove(item)
+            picked.append(item)
+        self.assertEqual(sorted(picked), sorted(str(i) for i in range(50)))
@@ -0,0 +1,42 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src import profiling
+
+
+class Tracing(unittest.TestCase):
+    def test_disabled(self):
+        tracer = profiling.Tracer()
+        with tracer.span('nothing'):
+            pass
+        self.assertIsNone(tracer.events)
+
+    def test_spans(self):
+        tracer = profiling.Tracer()
+        tracer.enable()
+        with tracer.span('outer'):
+            with tracer.span('inner'):
+                pass
+        with tracer.span('answer', profiling.USER, asked='Hello'):
+            pass
+        self.assertEqual([event['name'] for event in tracer.events], ['inner', 'outer', 'answer'])
+        self.assertEqual(tracer.events[2]['args'], {'asked': 'Hello'})
+        # inner is nested in outer, and isn't counted twice
+        outer = tracer.events[1]['dur'] / 1e6
+        self.assertAlmostEqual(tracer.totals()[profiling.PROGRAM], outer)
+
+    def test_write(self):
+        tracer = profiling.Tracer()
+        tracer.enable()
+        with tracer.span('span'):
+            pass
+        fd, path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        tracer.write(path)
+        with open(path, encoding='utf8') as f:
+            trace = json.load(f)
+        self.assertEqual(trace['traceEvents'][0]['ph'], 'X')
+        self.assertIn(profiling.PROGRAM, trace['otherData'])
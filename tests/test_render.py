@@ -0,0 +1,23 @@
+import unittest
+
+from src import items, render
+
+
+class Recap(unittest.TestCase):
+    def setUp(self):
+        self.data = items.ItemStore((f'key {i}', 'value' if i % 2 else 'v') for i in range(10)).view()
+
+    def test_columns(self):
+        rows = render.recap_rows(self.data, width=80)
+        # 10 items: 2 columns of 15 characters
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0], 'key 0 : v'.ljust(15) + 'key 1 : value'.ljust(15))
+
+    def test_narrow_terminal(self):
+        self.assertEqual(len(render.recap_rows(self.data, width=20)), 10)
+        self.assertEqual(render.recap_rows(self.data)[1].rstrip(), 'key 1 : value')
+        self.assertEqual(render.recap_rows({}), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import collections
+import os
+import tempfile
+import unittest
+
+from src import reviews
+
+
+class Schedule(unittest.TestCase):
+    def test_intervals(self):
+        state = (reviews.DEFAULT_EASE, 0, 0)
+        intervals = list()
+        for _ in range(3):
+            state = reviews.schedule(*state, correct=True)
+            intervals.append(state[1])
+        self.assertEqual(intervals[:2], [1, 6])
+        self.assertGreater(intervals[2], 6)
+
+    def test_failed(self):
+        ease, interval, reps = reviews.schedule(reviews.MIN_EASE, 6, 2, correct=False)
+        self.assertEqual((ease, interval, reps), (reviews.MIN_EASE, 0, 0))
+
+
+class Store(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+
+    def test_due(self):
+        data = collections.OrderedDict([('a', '1'), ('b', '2'), ('c', '3')])
+        with reviews.ReviewStore(self.path) as store:
+            self.assertEqual(list(reviews.due_learndata(data, store, now=0)), ['a', 'b', 'c'])
+            store.record({'a': True, 'b': False}, now=0)
+        # reopening the store keeps the reviews
+        with reviews.ReviewStore(self.path) as store:
+            self.assertEqual(sorted(reviews.due_learndata(data, store, now=1)), ['b', 'c'])
+            self.assertEqual(sorted(reviews.due_learndata(data, store, now=2 * reviews.DAY)), ['a', 'b', 'c'])
+
+    def test_unchanged_deck(self):
+        # the items of a deck that didn't change aren't inserted again
+        with reviews.ReviewStore(self.path) as store:
+            store.add(['a', 'b'])
+        with reviews.ReviewStore(self.path) as store:
+            statements = list()
+            store.db.set_trace_callback(statements.append)
+            store.add(['a', 'b'])
+            self.assertFalse([statement for statement in statements if statement.startswith('INSERT')])
+            store.add(['a', 'b', 'c'])
+            self.assertEqual(store.due(now=0), ['a', 'b', 'c'])
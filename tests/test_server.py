@@ -0,0 +1,124 @@
+import asyncio
+import json
+import unittest
+from http import HTTPStatus
+from unittest import mock
+
+from src import parser, server
+
+LEARNDATA = '''--title Vocabulaire
+--ask-order keep
+--ask-for keys
+--show-answer-in-testing-mode
+
+bank
+banque
+
+shore
+rive
+
+summer
+été
+'''
+
+
+def load_deck(text: str = LEARNDATA) -> server.Deck:
+    data, flags = parser.parse(text.splitlines(keepends=True))
+    flags = parser.FlagsParser(flags)
+    return server.Deck('vocabulary', parser.transform_learndata(data, flags), flags)
+
+
+class Session(unittest.TestCase):
+    def test_testing(self):
+        session = server.Session(load_deck(), testing=True)
+        self.assertEqual(session.state()['question'], 'bank')
+        self.assertEqual(session.answer(' banque '), {'found': True})
+        self.assertEqual(session.answer('plage'), {'found': False, 'answer': 'rive'})
+        session.answer('été')
+        state = session.state()
+        self.assertIsNone(state['question'])
+        self.assertEqual((state['grade'], state['notfound']), (66.67, {'shore': 'rive'}))
+        with self.assertRaises(server.HTTPError):
+            session.answer('rive')
+
+    def test_training(self):
+        deck = load_deck()
+        session = server.Session(deck, testing=False)
+        asked = list()
+        while session.remaining:
+            question = session.state()['question']
+            asked.append(question)
+            # every question is failed once
+            session.answer(deck.data[question] if asked.count(question) > 1 else '')
+        self.assertEqual(sorted(asked), sorted(deck.questions * 2))
+
+
+class QuizServer(unittest.TestCase):
+    def setUp(self):
+        self.quiz = server.QuizServer({'vocabulary': load_deck()})
+
+    def call(self, method: str, path: str, payload: dict = None) -> tuple:
+        body = json.dumps(payload).encode() if payload is not None else b''
+        try:
+            return self.quiz.dispatch(method, path, body)
+        except server.HTTPError as e:
+            return e.status, str(e)
+
+    def test_session(self):
+        status, state = self.call('POST', '/sessions', {'deck': 'vocabulary'})
+        self.assertEqual((status, state['question'], state['remaining']), (HTTPStatus.CREATED, 'bank', 3))
+        path = '/sessions/' + state['session']
+        status, state = self.call('POST', path + '/answers', {'answer': 'banque'})
+        self.assertEqual((status, state['found'], state['question']), (HTTPStatus.OK, True, 'shore'))
+        self.assertEqual(self.call('DELETE', path)[0], HTTPStatus.NO_CONTENT)
+        self.assertEqual(self.call('GET', path)[0], HTTPStatus.NOT_FOUND)
+
+    def test_errors(self):
+        self.assertEqual(self.call('POST', '/sessions', {'deck': 'unknown'})[0], HTTPStatus.NOT_FOUND)
+        self.assertEqual(self.call('POST', '/sessions', {'deck': 'vocabulary', 'mode': 'exam'})[0], HTTPStatus.BAD_REQUEST)
+        self.assertEqual(self.call('DELETE', '/decks')[0], HTTPStatus.METHOD_NOT_ALLOWED)
+        self.assertEqual(self.call('GET', '/nowhere')[0], HTTPStatus.NOT_FOUND)
+        with self.assertRaises(server.HTTPError) as error:
+            self.quiz.dispatch('POST', '/sessions', b'{"deck": ')
+        self.assertEqual(error.exception.status, HTTPStatus.BAD_REQUEST)
+
+    def test_http(self):
+        async def run():
+            listening = await self.quiz.start('127.0.0.1', 0)
+            port = listening.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            # two requests on the same connection
+            for _ in range(2):
+                writer.write(b'GET /decks HTTP/1.1\r\nHost: localhost\r\n\r\n')
+                head = await reader.readuntil(b'\r\n\r\n')
+                self.assertTrue(head.startswith(b'HTTP/1.1 200 OK'))
+                length = int(head.split(b'Content-Length: ')[1].split(b'\r\n')[0])
+                decks = json.loads(await reader.readexactly(length))['decks']
+                self.assertEqual(decks, [{'name': 'vocabulary', 'title': 'Vocabulaire', 'count': 3}])
+            writer.close()
+            listening.close()
+            await listening.wait_closed()
+        asyncio.run(run())
+
+    def test_internal_error(self):
+        async def run():
+            listening = await self.quiz.start('127.0.0.1', 0)
+            port = listening.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            # a failing request gets a 500, and the connection is still served
+            for expected in (b'HTTP/1.1 500', b'HTTP/1.1 200'):
+                writer.write(b'GET /decks HTTP/1.1\r\nHost: localhost\r\n\r\n')
+                head = await reader.readuntil(b'\r\n\r\n')
+                self.assertTrue(head.startswith(expected))
+                await reader.readexactly(int(head.split(b'Content-Length: ')[1].split(b'\r\n')[0]))
+            writer.close()
+            listening.close()
+            await listening.wait_closed()
+
+        with mock.patch.object(server.QuizServer, 'list_decks', side_effect=[RuntimeError('bug'), (HTTPStatus.OK, {})]), \
+                self.assertLogs(level='ERROR'):
+            asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
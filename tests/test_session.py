@@ -0,0 +1,58 @@
+import asyncio
+import io
+import os
+import unittest
+from unittest import mock
+
+from src import session
+
+
+class Terminal(unittest.TestCase):
+    def setUp(self):
+        read_end, self.write_end = os.pipe()
+        self.stdin = os.fdopen(read_end, encoding='utf8')
+        self.terminal = session.Terminal(self.stdin)
+
+    def tearDown(self):
+        # the end of the input stops the reader thread, which holds stdin
+        try:
+            os.close(self.write_end)
+        except OSError:
+            pass
+        self.stdin.close()
+
+    def type(self, text):
+        os.write(self.write_end, text.encode())
+
+    async def ask(self, timeout):
+        with mock.patch('sys.stdout', io.StringIO()):
+            return await self.terminal.input('> ', timeout)
+
+    def test_time_limit(self):
+        async def run():
+            self.type('first\n')
+            self.assertEqual(await self.ask(1), 'first')
+            self.assertIsNone(await self.ask(0.1))
+            # typed too late for the previous question
+            self.type('late\n')
+            await asyncio.sleep(0.1)
+            answer = asyncio.create_task(self.ask(1))
+            await asyncio.sleep(0.1)
+            self.type('second\n')
+            self.assertEqual(await answer, 'second')
+            os.close(self.write_end)
+            with self.assertRaises(EOFError):
+                await self.ask(1)
+        asyncio.run(run())
+
+    def test_pause(self):
+        async def run():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            await self.terminal.pause(0.1)
+            self.assertGreaterEqual(loop.time() - start, 0.1)
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# maximum cumulative import time of src.main, in microseconds
+IMPORT_TIME_BUDGET = 250_000
+# modules that should only be imported when they're actually needed
+LAZY_MODULES = ('tkinter', 'termcolor', 'colorama', 'asyncio')
+
+
+def import_times(statement: str) -> tuple:
+    # runs `statement` in a new interpreter with -X importtime and returns the cumulative import time of each module
+    # (a dict) and what it printed
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    times = dict()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative)
+    return times, result.stdout
+
+
+class Startup(unittest.TestCase):
+    def test_lazy_modules(self):
+        times, _ = import_times('import src.main')
+        for module in LAZY_MODULES:
+            self.assertNotIn(module, times)
+
+    def test_import_time_budget(self):
+        times, _ = import_times('import src.main')
+        self.assertLess(times['src.main'], IMPORT_TIME_BUDGET)
+
+    def test_lazy_translations(self):
+        _, out = import_times('import src.main, src.consts; print(src.consts.T.loaded)')
+        self.assertEqual(out.strip(), 'False')
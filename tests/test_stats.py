@@ -0,0 +1,60 @@
+import collections
+import os
+import shutil
+import tempfile
+import unittest
+
+from src import stats
+
+
+class Stats(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.path = os.path.join(self.root, 'stats')
+
+    def test_summary(self):
+        with stats.StatsStore(self.path) as store:
+            store.log('a', False, 1.5)
+            store.log('b', True, 0.5)
+            store.log('a', True, 2.0)
+        with stats.StatsStore(self.path) as store:
+            self.assertEqual(store.summary, {'rows': 3, 'attempts': [2, 1], 'failures': [1, 0]})
+            store.log('b', False, 1.0)
+        with stats.StatsStore(self.path) as store:
+            self.assertEqual(store.summary['failures'], [1, 1])
+
+    def test_interrupted_write(self):
+        with stats.StatsStore(self.path) as store:
+            store.log('a', False, 1.5)
+        # only the first column of the second row was written
+        with open(os.path.join(self.path, 'item'), 'ab') as f:
+            f.write(bytes(4))
+        with stats.StatsStore(self.path) as store:
+            self.assertEqual(store.summary['rows'], 1)
+
+    def test_partial_row(self):
+        with stats.StatsStore(self.path) as store:
+            store.log('a', True, 1)
+            store.log('b', True, 1)
+        with open(os.path.join(self.path, 'item'), 'ab') as f:
+            f.write(bytes(4))
+        with open(os.path.join(self.path, 'items.txt'), 'a', encoding='utf8') as f:
+            f.write('c')
+        # new rows and items line up with the complete ones
+        with stats.StatsStore(self.path) as store:
+            store.log('a', False, 1)
+            store.log('a', False, 1)
+            store.log('d', True, 1)
+        with stats.StatsStore(self.path) as store:
+            self.assertEqual(store.items, ['a', 'b', 'd'])
+            self.assertEqual(store.summary['attempts'], [3, 1, 1])
+            self.assertEqual(store.summary['failures'], [2, 0, 0])
+
+    def test_hardest_first(self):
+        with stats.StatsStore(self.path) as store:
+            for _ in range(3):
+                store.log('easy', True, 1)
+                store.log('hard', False, 1)
+            data = collections.OrderedDict([('easy', '1'), ('new', '2'), ('hard', '3')])
+            self.assertEqual(list(stats.hardest_first(data, store)), ['hard', 'new', 'easy'])